@@ -0,0 +1,310 @@
+import os
+import shutil
+import time
+import numpy as np
+from limitador import pesos_requisicoes
+
+
+# PARÂMETROS DO ARMAZENAMENTO
+#-----------------------------------------------------------------------------------------
+pasta_dados = "./dados"          # PASTA ONDE FICAM OS ARQUIVOS DAS CANDLES
+limite_inicial = 500             # QTD DE CANDLES BAIXADAS QUANDO AINDA NÃO EXISTE HISTÓRICO
+limite_por_requisicao = 1000     # MÁXIMO DE KLINES QUE A BINANCE DEVOLVE POR CHAMADA
+#-----------------------------------------------------------------------------------------
+
+
+# CONVERTER A LISTA DE KLINES DA BINANCE EM COLUNAS TIPADAS
+#-----------------------------------------------------------------------------------------
+def converter_klines(candles):
+    """
+    Extrai só o preço de fechamento (índice 4) e o tempo de fechamento (índice 6) das klines.
+
+    :param candles: Lista de klines como devolvida por get_klines.
+    :return: (fechamento float64, tempo_fechamento int64 em ms UTC).
+    """
+    quantidade = len(candles)
+    fechamento = np.fromiter((float(vela[4]) for vela in candles), dtype=np.float64, count=quantidade)
+    tempo_fechamento = np.fromiter((int(vela[6]) for vela in candles), dtype=np.int64, count=quantidade)
+    return fechamento, tempo_fechamento
+#-----------------------------------------------------------------------------------------
+
+
+# DURAÇÃO DE UM INTERVALO DA BINANCE ("1m", "4h", "1d", "1w", "1M") EM MS
+#-----------------------------------------------------------------------------------------
+unidades_intervalo_ms = {"s": 1000, "m": 60_000, "h": 3600_000, "d": 86400_000, "w": 7 * 86400_000, "M": 31 * 86400_000}
+
+def duracao_intervalo_ms(intervalo):
+    """O mês conta como 31 dias (o maior possível), pra nunca ser menor que a distância entre duas candles."""
+    return int(intervalo[:-1]) * unidades_intervalo_ms[intervalo[-1]]
+#-----------------------------------------------------------------------------------------
+
+
+# ARQUIVOS DAS COLUNAS DE UM PAR (CODIGO, INTERVALO)
+#-----------------------------------------------------------------------------------------
+def caminhos_colunas(codigo, intervalo, pasta=pasta_dados):
+    base = os.path.join(pasta, f"{codigo}_{intervalo}")
+    return f"{base}_fechamento.f64", f"{base}_tempo.i64"
+
+
+def abrir_colunas(codigo, intervalo, pasta=pasta_dados):
+    """
+    Abre as colunas salvas como memmap somente leitura (nada é carregado na memória até ser lido).
+
+    :return: (fechamento, tempo_fechamento) com o mesmo tamanho; arrays vazios se não houver histórico.
+    """
+    caminho_fechamento, caminho_tempo = caminhos_colunas(codigo, intervalo, pasta)
+    if not (os.path.exists(caminho_fechamento) and os.path.exists(caminho_tempo)):
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+
+    # SE O PROGRAMA CAIU NO MEIO DE UMA GRAVAÇÃO AS COLUNAS PODEM TER TAMANHOS DIFERENTES
+    tamanho = min(os.path.getsize(caminho_fechamento), os.path.getsize(caminho_tempo)) // 8
+    if tamanho == 0:
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+
+    fechamento = np.memmap(caminho_fechamento, dtype=np.float64, mode="r", shape=(tamanho,))
+    tempo_fechamento = np.memmap(caminho_tempo, dtype=np.int64, mode="r", shape=(tamanho,))
+    return fechamento, tempo_fechamento
+#-----------------------------------------------------------------------------------------
+
+
+class ArmazenamentoCandles:
+    """
+    Histórico local das candles fechadas de um par (codigo, intervalo).
+
+    As candles ficam em dois arquivos colunares binários na pasta de dados (fechamento em float64 e
+    tempo_fechamento em int64 ms). Na inicialização o histórico é carregado do disco e, a cada
+    atualização, só são pedidas à Binance as candles posteriores ao último fechamento salvo.
+    A candle ainda em andamento não vai para o disco, fica só em memória em `vela_aberta`.
+    """
+
+    def __init__(self, codigo, intervalo, pasta=pasta_dados):
+        self.codigo = codigo
+        self.intervalo = intervalo
+
+        self.caminho_fechamento, self.caminho_tempo = caminhos_colunas(codigo, intervalo, pasta)
+        os.makedirs(pasta, exist_ok=True)
+
+        self.tamanho = 0
+        self._fechamento = np.empty(0, dtype=np.float64)
+        self._tempo_fechamento = np.empty(0, dtype=np.int64)
+        self.vela_aberta = None  # (fechamento, tempo_fechamento) da candle em andamento
+
+        self._carregar()
+
+    # LEITURA DO DISCO
+    #-------------------------------------------------------------------------------------
+    def _carregar(self):
+        if not (os.path.exists(self.caminho_fechamento) and os.path.exists(self.caminho_tempo)):
+            return
+
+        # SE O PROGRAMA CAIU NO MEIO DE UMA GRAVAÇÃO AS COLUNAS PODEM TER TAMANHOS DIFERENTES: CORTA A SOBRA NO
+        # DISCO TAMBÉM, SENÃO O PRÓXIMO adicionar GRAVA DEPOIS DELA E DESALINHA FECHAMENTO E TEMPO PRA SEMPRE
+        tamanho = min(os.path.getsize(self.caminho_fechamento), os.path.getsize(self.caminho_tempo)) // 8
+        for caminho in (self.caminho_fechamento, self.caminho_tempo):
+            if os.path.getsize(caminho) != tamanho * 8:
+                os.truncate(caminho, tamanho * 8)
+
+        fechamento = np.fromfile(self.caminho_fechamento, dtype=np.float64, count=tamanho)
+        tempo_fechamento = np.fromfile(self.caminho_tempo, dtype=np.int64, count=tamanho)
+        self._reservar(tamanho)
+        self._fechamento[:tamanho] = fechamento[:tamanho]
+        self._tempo_fechamento[:tamanho] = tempo_fechamento[:tamanho]
+        self.tamanho = tamanho
+    #-------------------------------------------------------------------------------------
+
+    # ESPAÇO EM MEMÓRIA (DOBRA A CAPACIDADE PRA O APPEND SER O(1) AMORTIZADO)
+    #-------------------------------------------------------------------------------------
+    def _reservar(self, capacidade):
+        if capacidade <= len(self._fechamento):
+            return
+        capacidade = max(capacidade, 2 * len(self._fechamento), limite_por_requisicao)
+
+        fechamento = np.empty(capacidade, dtype=np.float64)
+        tempo_fechamento = np.empty(capacidade, dtype=np.int64)
+        fechamento[:self.tamanho] = self._fechamento[:self.tamanho]
+        tempo_fechamento[:self.tamanho] = self._tempo_fechamento[:self.tamanho]
+        self._fechamento = fechamento
+        self._tempo_fechamento = tempo_fechamento
+    #-------------------------------------------------------------------------------------
+
+    @property
+    def ultimo_tempo_fechamento(self):
+        if self.tamanho == 0:
+            return None
+        return int(self._tempo_fechamento[self.tamanho - 1])
+
+    # ADICIONAR CANDLES FECHADAS (MEMÓRIA + DISCO)
+    #-------------------------------------------------------------------------------------
+    def adicionar(self, fechamento, tempo_fechamento):
+        ultimo = self.ultimo_tempo_fechamento
+        if ultimo is not None:
+            novas = tempo_fechamento > ultimo
+            fechamento = fechamento[novas]
+            tempo_fechamento = tempo_fechamento[novas]
+
+        quantidade = len(fechamento)
+        if quantidade == 0:
+            return 0
+
+        self._reservar(self.tamanho + quantidade)
+        self._fechamento[self.tamanho:self.tamanho + quantidade] = fechamento
+        self._tempo_fechamento[self.tamanho:self.tamanho + quantidade] = tempo_fechamento
+        self.tamanho += quantidade
+
+        with open(self.caminho_fechamento, "ab") as arquivo:
+            np.ascontiguousarray(fechamento, dtype=np.float64).tofile(arquivo)
+        with open(self.caminho_tempo, "ab") as arquivo:
+            np.ascontiguousarray(tempo_fechamento, dtype=np.int64).tofile(arquivo)
+
+        return quantidade
+    #-------------------------------------------------------------------------------------
+
+    # BUSCAR NA BINANCE SÓ O QUE AINDA NÃO TEMOS
+    #-------------------------------------------------------------------------------------
+    def atualizar(self, cliente):
+        """
+        Pede à Binance as candles mais novas que o último fechamento salvo.
+
+        As candles já fechadas são gravadas no disco e a candle em andamento substitui `vela_aberta`.
+        A última kline da resposta é sempre tratada como em andamento (a Binance sempre devolve a candle atual):
+        comparar com o relógio local gravaria um preço parcial como fechado se o relógio estiver adiantado, e
+        essa candle nunca mais seria buscada. Ela só vai pro disco quando uma kline mais nova aparecer.
+
+        :param cliente: Cliente da Binance (precisa de get_klines).
+        :return: Quantidade de candles fechadas novas.
+        """
+        ultimo = self.ultimo_tempo_fechamento
+        if ultimo is None:
+            candles = cliente.get_klines(symbol=self.codigo, interval=self.intervalo, limit=limite_inicial)
+        else:
+            # PAGINA PELO startTime ATÉ ALCANÇAR A CANDLE ATUAL (SÓ DÁ MAIS DE UMA VOLTA SE O BOT FICOU PARADO)
+            candles = []
+            inicio = ultimo + 1
+            while True:
+                pagina = cliente.get_klines(symbol=self.codigo, interval=self.intervalo, startTime=inicio, limit=limite_por_requisicao)
+                candles.extend(pagina)
+                if len(pagina) < limite_por_requisicao:
+                    break
+                inicio = int(pagina[-1][6]) + 1
+
+        if not candles:
+            return 0
+
+        fechamento, tempo_fechamento = converter_klines(candles)
+
+        self.vela_aberta = (float(fechamento[-1]), int(tempo_fechamento[-1]))
+        return self.adicionar(fechamento[:-1], tempo_fechamento[:-1])
+    #-------------------------------------------------------------------------------------
+
+    # ÚLTIMAS N CANDLES (FECHADAS + A EM ANDAMENTO, IGUAL AO get_klines)
+    #-------------------------------------------------------------------------------------
+    def ultimas(self, quantidade):
+        """
+        :return: (fechamento, tempo_fechamento) com as últimas `quantidade` candles, incluindo a aberta.
+        """
+        fechadas = quantidade - 1 if self.vela_aberta is not None else quantidade
+        inicio = max(self.tamanho - fechadas, 0)
+        fechamento = self._fechamento[inicio:self.tamanho]
+        tempo_fechamento = self._tempo_fechamento[inicio:self.tamanho]
+
+        if self.vela_aberta is not None:
+            fechamento = np.append(fechamento, self.vela_aberta[0])
+            tempo_fechamento = np.append(tempo_fechamento, self.vela_aberta[1])
+        else:
+            fechamento = fechamento.copy()
+            tempo_fechamento = tempo_fechamento.copy()
+
+        return fechamento, tempo_fechamento
+    #-------------------------------------------------------------------------------------
+
+
+# DOWNLOAD EM MASSA DO HISTÓRICO (ANOS DE CANDLES), GRAVANDO DIRETO NAS COLUNAS
+#-----------------------------------------------------------------------------------------
+def baixar_historico(cliente, codigo, intervalo, inicio_ms, fim_ms=None, pasta=pasta_dados, limitador=None, ao_progredir=None):
+    """
+    Pagina o get_klines pelo startTime e grava as candles fechadas nos mesmos arquivos do ArmazenamentoCandles.
+
+    Cada página vai direto pro disco, então a memória usada não depende do tamanho do período. Se já existir
+    histórico, só baixa o que falta: o trecho anterior à primeira candle salva (regravando os arquivos com ele na
+    frente) e o trecho depois da última.
+
+    :param inicio_ms: Início do período em ms UTC.
+    :param fim_ms: Fim do período em ms UTC (default = agora).
+    :param limitador: LimitadorPeso opcional pra respeitar o peso de requisições da Binance.
+    :param ao_progredir: Função chamada com (codigo, tempo_fechamento_ms da última candle gravada) a cada página.
+    :return: Quantidade de candles gravadas.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    caminho_fechamento, caminho_tempo = caminhos_colunas(codigo, intervalo, pasta)
+    agora_ms = int(time.time() * 1000)
+    fim_ms = min(fim_ms or agora_ms, agora_ms)
+
+    fechamento, tempo_fechamento = abrir_colunas(codigo, intervalo, pasta)
+    tamanho = len(tempo_fechamento)
+    primeiro = int(tempo_fechamento[0]) if tamanho else None
+    ultimo = int(tempo_fechamento[-1]) if tamanho else None
+    del fechamento, tempo_fechamento
+
+    # DEIXA AS DUAS COLUNAS COM O MESMO TAMANHO ANTES DE ACRESCENTAR
+    for caminho in (caminho_fechamento, caminho_tempo):
+        if os.path.exists(caminho) and os.path.getsize(caminho) != tamanho * 8:
+            os.truncate(caminho, tamanho * 8)
+
+    gravadas = 0
+    if primeiro is None:
+        gravadas += _baixar_paginas(cliente, codigo, intervalo, inicio_ms, fim_ms, caminho_fechamento, caminho_tempo, limitador, ao_progredir)
+        return gravadas
+
+    if inicio_ms < primeiro:
+        # TRECHO MAIS ANTIGO: BAIXA EM ARQUIVOS NOVOS E COLOCA O HISTÓRICO EXISTENTE DEPOIS
+        novo_fechamento, novo_tempo = f"{caminho_fechamento}.novo", f"{caminho_tempo}.novo"
+        for caminho in (novo_fechamento, novo_tempo):
+            if os.path.exists(caminho):
+                os.remove(caminho)
+        gravadas += _baixar_paginas(cliente, codigo, intervalo, inicio_ms, primeiro - 1, novo_fechamento, novo_tempo, limitador, ao_progredir, limite_tempo=primeiro)
+        for novo, atual in ((novo_fechamento, caminho_fechamento), (novo_tempo, caminho_tempo)):
+            with open(novo, "ab") as destino, open(atual, "rb") as origem:
+                shutil.copyfileobj(origem, destino)
+        os.replace(novo_fechamento, caminho_fechamento)
+        os.replace(novo_tempo, caminho_tempo)
+
+    if fim_ms > ultimo:
+        gravadas += _baixar_paginas(cliente, codigo, intervalo, ultimo + 1, fim_ms, caminho_fechamento, caminho_tempo, limitador, ao_progredir)
+    return gravadas
+
+
+def _baixar_paginas(cliente, codigo, intervalo, inicio_ms, fim_ms, caminho_fechamento, caminho_tempo, limitador, ao_progredir, limite_tempo=None):
+    agora_ms = int(time.time() * 1000)
+    ate_agora = limite_tempo is None and fim_ms >= agora_ms
+    gravadas = 0
+
+    while inicio_ms <= fim_ms:
+        if limitador is not None:
+            limitador.adquirir(pesos_requisicoes["get_klines"])
+        pagina = cliente.get_klines(symbol=codigo, interval=intervalo, startTime=inicio_ms, endTime=fim_ms, limit=limite_por_requisicao)
+        if not pagina:
+            break
+
+        fechamento, tempo_fechamento = converter_klines(pagina)
+
+        # SÓ CANDLES FECHADAS E (NO TRECHO ANTIGO) ANTERIORES AO HISTÓRICO QUE JÁ EXISTE
+        validas = tempo_fechamento < agora_ms
+        if limite_tempo is not None:
+            validas &= tempo_fechamento < limite_tempo
+        if ate_agora and len(pagina) < limite_por_requisicao:
+            # ÚLTIMA PÁGINA ATÉ AGORA: A ÚLTIMA KLINE É A CANDLE EM ANDAMENTO, MESMO COM O RELÓGIO LOCAL ADIANTADO
+            validas[-1] = False
+        with open(caminho_fechamento, "ab") as arquivo:
+            fechamento[validas].tofile(arquivo)
+        with open(caminho_tempo, "ab") as arquivo:
+            tempo_fechamento[validas].tofile(arquivo)
+        gravadas += int(validas.sum())
+
+        if ao_progredir is not None:
+            ao_progredir(codigo, int(tempo_fechamento[-1]))
+        if len(pagina) < limite_por_requisicao or not validas[-1]:
+            break
+        inicio_ms = int(tempo_fechamento[-1]) + 1
+
+    return gravadas
+#-----------------------------------------------------------------------------------------
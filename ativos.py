@@ -1,8 +1,4 @@
-import pandas as pd
 import os 
-import time 
-from binance.client import Client
-from binance.enums import *
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,20 +9,31 @@ secret_key = os.getenv("SECRET_KEY")
 # print("Api key ", api_key)
 # print("Secret key ", secret_key)
 
-cliente_binance = Client(api_key, secret_key)
-
-conta = cliente_binance.get_account()
-
 moedas = [
     {"codigo": "BTCBRL", "ativo": "BTC", "quantidade_moeda": 0.00002, "posicao_atual": False},
     {"codigo": "ETHBRL", "ativo": "ETH", "quantidade_moeda": 0.0006, "posicao_atual": False},
     {"codigo": "ADABRL", "ativo": "ADA", "quantidade_moeda": 2, "posicao_atual": False},
 ]
 
-for ativo in conta["balances"]:
-    
-    for moeda in moedas:
-        if moeda["ativo"] == ativo["asset"]:
-            print(ativo)
-    # if ativo["asset"] == 'BTC':
-    #     print(ativo)
\ No newline at end of file
+
+# MOSTRA O SALDO DAS MOEDAS DA LISTA (O CLIENTE SÓ É CRIADO AQUI, NÃO NO IMPORT)
+#-----------------------------------------------------------------
+def mostrar_saldos():
+    from binance.client import Client
+
+    cliente_binance = Client(api_key, secret_key)
+
+    conta = cliente_binance.get_account()
+
+    for ativo in conta["balances"]:
+        
+        for moeda in moedas:
+            if moeda["ativo"] == ativo["asset"]:
+                print(ativo)
+        # if ativo["asset"] == 'BTC':
+        #     print(ativo)
+#-----------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    mostrar_saldos()
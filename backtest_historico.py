@@ -0,0 +1,77 @@
+import numpy as np
+from armazenamento_candles import abrir_colunas, pasta_dados
+from simulacao import calcular_medias_moveis, gerar_sinais, simular_operacoes
+
+
+# BACKTEST EM BLOCOS SOBRE O HISTÓRICO SALVO EM DISCO (MEMÓRIA LIMITADA PELO TAMANHO DO BLOCO)
+#----------------------------------------------------------------------------------------------------
+def backtest_em_blocos(codigo, intervalo, media_rapida=7, media_lenta=40, taxa=0.001, valor_por_trade=11, saldo_inicial=10000,
+                       tamanho_bloco=1_000_000, pasta=pasta_dados, ao_terminar_bloco=None):
+    """
+    Mesma estratégia do backtest_estrategia, lendo as colunas do disco em blocos de `tamanho_bloco` candles.
+
+    Entre um bloco e outro são carregados:
+    - os últimos `media_lenta` preços, pra as médias e o cruzamento da primeira linha do bloco saírem iguais;
+    - o saldo em BRL e no ativo (a posição);
+    - o pico do patrimônio, pra o drawdown máximo valer pro período inteiro.
+
+    As médias são feitas com soma acumulada, então em empates exatos o sinal pode diferir do rolling do pandas
+    por arredondamento.
+
+    Parâmetros:
+    - codigo / intervalo: Par e intervalo baixados com armazenamento_candles.baixar_historico.
+    - tamanho_bloco: Quantidade de candles lidas por vez.
+    - ao_terminar_bloco: Função opcional chamada com (tempo_fechamento do bloco, patrimônio do bloco) pra quem
+      quiser gravar a curva de patrimônio sem segurar ela inteira na memória.
+
+    Retorna:
+    - Dicionário com saldo_final, operacoes, drawdown, candles e historico (tipo, tempo_fechamento ms, preço, valor).
+    """
+    fechamento, tempo_fechamento = abrir_colunas(codigo, intervalo, pasta)
+    total = len(fechamento)
+    if total == 0:
+        raise ValueError(f"Não existe histórico salvo para {codigo} {intervalo}")
+
+    janela_carregada = max(media_rapida, media_lenta)
+    cauda = np.empty(0, dtype=np.float64)
+    saldo_brl = saldo_inicial
+    saldo_ativo = 0.0
+    pico = -np.inf
+    drawdown = 0.0
+    historico = []
+
+    for inicio in range(0, total, tamanho_bloco):
+        precos_bloco = np.asarray(fechamento[inicio:inicio + tamanho_bloco], dtype=np.float64)
+        tempos_bloco = np.asarray(tempo_fechamento[inicio:inicio + tamanho_bloco], dtype=np.int64)
+
+        # MÉDIAS E SINAIS CALCULADOS COM A CAUDA DO BLOCO ANTERIOR NA FRENTE, DEPOIS A CAUDA É DESCARTADA
+        precos = np.concatenate((cauda, precos_bloco))
+        medias = calcular_medias_moveis(precos, [media_rapida, media_lenta])
+        sinal = gerar_sinais(medias[media_rapida], medias[media_lenta])[len(cauda):]
+
+        resultado = simular_operacoes(precos_bloco, sinal, taxa=taxa, valor_por_trade=valor_por_trade, saldo_brl=saldo_brl, saldo_ativo=saldo_ativo)
+        saldo_brl = resultado["saldo_brl"]
+        saldo_ativo = resultado["saldo_ativo"]
+
+        for indice, tipo, valor in zip(resultado["indices"], resultado["tipos"], resultado["valores"]):
+            historico.append(("compra" if tipo == 1 else "venda", int(tempos_bloco[indice]), precos_bloco[indice], valor))
+
+        patrimonio = resultado["patrimonio"]
+        picos = np.maximum(np.maximum.accumulate(patrimonio), pico)
+        drawdown = max(drawdown, float(np.max((picos - patrimonio) / picos)))
+        pico = picos[-1]
+
+        if ao_terminar_bloco is not None:
+            ao_terminar_bloco(tempos_bloco, patrimonio)
+
+        cauda = precos[-janela_carregada:].copy()
+
+    saldo_final = saldo_brl + saldo_ativo * float(fechamento[-1])
+    return {
+        "saldo_final": saldo_final,
+        "operacoes": len(historico),
+        "drawdown": drawdown,
+        "candles": total,
+        "historico": historico,
+    }
+#----------------------------------------------------------------------------------------------------
@@ -0,0 +1,152 @@
+import numpy as np
+from simulacao import calcular_drawdown, calcular_medias_moveis
+
+
+# ALINHAR AS CANDLES DE TODAS AS MOEDAS NUM ÍNDICE DE TEMPO COMUM
+#----------------------------------------------------------------------------------------------------
+def alinhar_candles(velas):
+    """
+    Monta a matriz de preços (tempo x moeda) a partir das candles de cada moeda.
+
+    O índice é a união dos tempos de fechamento. Onde uma moeda não tem candle naquele tempo, repete o último
+    preço conhecido; antes da primeira candle dela fica nan (a moeda ainda não existia / não foi baixada).
+    O preço repetido só serve pra avaliar a carteira: `reais` marca as linhas em que a moeda tem candle de verdade.
+
+    :param velas: Dicionário codigo -> (fechamento, tempo_fechamento).
+    :return: (tempos int64, codigos, precos float64 e reais bool, os dois com shape (len(tempos), len(codigos))).
+    """
+    codigos = list(velas)
+    tempos = np.unique(np.concatenate([np.asarray(velas[codigo][1], dtype=np.int64) for codigo in codigos]))
+    precos = np.full((len(tempos), len(codigos)), np.nan)
+    reais = np.zeros((len(tempos), len(codigos)), dtype=bool)
+
+    for coluna, codigo in enumerate(codigos):
+        fechamento = np.asarray(velas[codigo][0], dtype=np.float64)
+        posicoes = np.searchsorted(tempos, np.asarray(velas[codigo][1], dtype=np.int64))
+        precos[posicoes, coluna] = fechamento
+        reais[posicoes, coluna] = True
+
+    # FORWARD FILL POR COLUNA: CADA LINHA PEGA O ÍNDICE DA ÚLTIMA LINHA COM PREÇO
+    linhas = np.where(np.isnan(precos), 0, np.arange(len(tempos))[:, None])
+    linhas = np.maximum.accumulate(linhas, axis=0)
+    precos = precos[linhas, np.arange(len(codigos))]
+    return tempos, codigos, precos, reais
+
+
+def medias_moveis_matriz(precos, reais, janelas):
+    """
+    Médias móveis de cada coluna calculadas só sobre as candles reais da moeda.
+
+    As linhas sem candle real ficam nan, então nenhuma condição de compra/venda é satisfeita nelas (preço repetido
+    daria médias iguais a menos de arredondamento e operações inventadas).
+
+    :return: Dicionário janela -> matriz com o mesmo shape de `precos`.
+    """
+    medias = {janela: np.full(precos.shape, np.nan) for janela in set(janelas)}
+    for coluna in range(precos.shape[1]):
+        linhas = np.flatnonzero(reais[:, coluna])
+        for janela, media in calcular_medias_moveis(precos[linhas, coluna], list(medias)).items():
+            medias[janela][linhas, coluna] = media
+    return medias
+#----------------------------------------------------------------------------------------------------
+
+
+# BACKTEST DA CARTEIRA INTEIRA COM O MESMO SALDO EM BRL
+#----------------------------------------------------------------------------------------------------
+def backtest_portfolio(velas, moedas, quantidade_reservada=1150, saldo_inicial=2000, taxa=0.001, media_ligeira=1, media_rapida=7,
+                       media_lenta=20, fracao_venda=0.99):
+    """
+    Simula a carteira como o robô ao vivo: todas as moedas usam o mesmo saldo em BRL e as regras do estrategia_trade.
+
+    - compra `quantidade_moeda` quando MA rápida > MA lenta, MA ligeira > MA lenta, a moeda não está comprada e o
+      saldo em BRL é maior que `quantidade_reservada`;
+    - vende `fracao_venda` do saldo da moeda quando MA rápida < MA lenta, MA ligeira < MA lenta e está comprada.
+
+    Médias, condições e o patrimônio são calculados de uma vez na matriz (tempo x moeda); uma moeda só opera nas
+    linhas em que tem candle própria, nas outras o último preço só entra no patrimônio. Só o saldo em BRL depende
+    da ordem das operações, então o tempo é percorrido linha a linha com operações vetorizadas entre as moedas; numa
+    mesma linha as moedas são processadas na ordem de `moedas`, igual ao rodar_varias_moedas.
+
+    Parâmetros:
+    - velas: Dicionário codigo -> (fechamento, tempo_fechamento).
+    - moedas: Lista de moedas no formato do robo_cripto (usa 'codigo' e 'quantidade_moeda').
+    - taxa: Taxa da Binance cobrada na moeda recebida (0.1% = 0.001).
+
+    Retorna:
+    - Dicionário com tempos, codigos, patrimonio (por linha), saldo_final, saldo_brl, quantidades por moeda,
+      historico (tipo, tempo_fechamento, codigo, preço, quantidade, valor em BRL), operacoes e drawdown.
+    """
+    moedas = [moeda for moeda in moedas if moeda["codigo"] in velas]
+    tempos, codigos, precos, reais = alinhar_candles({moeda["codigo"]: velas[moeda["codigo"]] for moeda in moedas})
+    quantidade_compra = np.array([float(moeda["quantidade_moeda"]) for moeda in moedas])
+
+    medias = medias_moveis_matriz(precos, reais, (media_ligeira, media_rapida, media_lenta))
+    ligeira, rapida, lenta = medias[media_ligeira], medias[media_rapida], medias[media_lenta]
+    condicao_compra = (rapida > lenta) & (ligeira > lenta) & reais
+    condicao_venda = (rapida < lenta) & (ligeira < lenta) & reais
+
+    # SÓ AS LINHAS EM QUE ALGUMA MOEDA PODE OPERAR PRECISAM SER VISITADAS
+    linhas_ativas = np.flatnonzero((condicao_compra | condicao_venda).any(axis=1))
+
+    saldo_brl = float(saldo_inicial)
+    comprado = np.zeros(len(codigos), dtype=bool)
+    quantidades = np.zeros(len(codigos))
+    saldo_por_linha = np.full(len(tempos), np.nan)
+    quantidades_por_linha = np.full((len(tempos), len(codigos)), np.nan)
+    saldo_por_linha[0] = saldo_brl
+    quantidades_por_linha[0] = quantidades
+    historico = []
+
+    for linha in linhas_ativas:
+        preco = precos[linha]
+        vendas = condicao_venda[linha] & comprado
+        compras = condicao_compra[linha] & ~comprado
+        if not (vendas.any() or compras.any()):
+            continue
+
+        quantidade_venda = np.where(vendas, quantidades * fracao_venda, 0.0)
+        recebido = quantidade_venda * np.where(vendas, preco, 0.0) * (1 - taxa)
+        custo = np.where(compras, quantidade_compra * np.where(compras, preco, 0.0), 0.0)
+
+        # SALDO ANTES DE CADA MOEDA SUPONDO QUE TODAS AS COMPRAS ACONTECEM; SE ALGUMA FICAR SEM SALDO, REFAZ EM ORDEM
+        fluxo = recebido - custo
+        saldo_antes = saldo_brl + np.cumsum(fluxo) - fluxo
+        if not np.all(saldo_antes[compras] > quantidade_reservada):
+            compras = compras.copy()
+            saldo_corrente = saldo_brl
+            for coluna in range(len(codigos)):
+                if compras[coluna] and not saldo_corrente > quantidade_reservada:
+                    compras[coluna] = False
+                saldo_corrente += recebido[coluna] - (custo[coluna] if compras[coluna] else 0.0)
+            custo = np.where(compras, custo, 0.0)
+
+        saldo_brl += float(recebido.sum() - custo.sum())
+        quantidades = quantidades - quantidade_venda + np.where(compras, quantidade_compra * (1 - taxa), 0.0)
+        comprado = (comprado & ~vendas) | compras
+        saldo_por_linha[linha] = saldo_brl
+        quantidades_por_linha[linha] = quantidades
+
+        for coluna in np.flatnonzero(vendas | compras):
+            if vendas[coluna]:
+                historico.append(("venda", int(tempos[linha]), codigos[coluna], preco[coluna], quantidade_venda[coluna], recebido[coluna]))
+            else:
+                historico.append(("compra", int(tempos[linha]), codigos[coluna], preco[coluna], quantidade_compra[coluna], custo[coluna]))
+
+    # ESTADO DAS LINHAS SEM OPERAÇÃO = ÚLTIMO ESTADO CONHECIDO
+    linhas = np.maximum.accumulate(np.where(np.isnan(saldo_por_linha), 0, np.arange(len(tempos))))
+    saldo_por_linha = saldo_por_linha[linhas]
+    quantidades_por_linha = quantidades_por_linha[linhas]
+    patrimonio = saldo_por_linha + np.nansum(quantidades_por_linha * precos, axis=1)
+
+    return {
+        "tempos": tempos,
+        "codigos": codigos,
+        "patrimonio": patrimonio,
+        "saldo_final": float(patrimonio[-1]),
+        "saldo_brl": saldo_brl,
+        "quantidades": dict(zip(codigos, quantidades)),
+        "historico": historico,
+        "operacoes": len(historico),
+        "drawdown": calcular_drawdown(patrimonio),
+    }
+#----------------------------------------------------------------------------------------------------
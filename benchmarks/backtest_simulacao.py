@@ -0,0 +1,94 @@
+import contextlib
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import robo_cripto
+
+
+# BACKTEST VETORIZADO (simulacao.py) CONFERIDO CONTRA O LOOP ORIGINAL COM iloc E MEDIDO
+# O valor por trade alto faz compras ficarem sem saldo, pra passar também pelo caminho de eventos um a um.
+# Uso: python -m benchmarks.backtest_simulacao [qtd_series] [candles_min] [candles_max]
+#-------------------------------------------------------------------------------------------------------------------
+def gerar_dados(quantidade_candles, semente, duracao_ms=3600_000):
+    aleatorio = np.random.default_rng(semente)
+    fechamento = np.exp(np.cumsum(aleatorio.normal(0, 0.01, quantidade_candles))) * 300000
+    tempo_fechamento = pd.to_datetime((np.arange(1, quantidade_candles + 1) * duracao_ms) - 1, unit="ms")
+    # FECHAMENTO COMO STRING, IGUAL AO QUE VINHA DO get_klines
+    return pd.DataFrame({"fechamento": [f"{preco:.8f}" for preco in fechamento], "tempo_fechamento": tempo_fechamento})
+
+
+def backtest_legado(dados, media_rapida=7, media_lenta=40, taxa=0.001, valor_por_trade=11):
+    """O backtest_estrategia de antes da vetorização, sem o print e o gráfico."""
+    dados = dados.copy()
+    dados["fechamento"] = pd.to_numeric(dados["fechamento"])
+
+    dados["media_rapida"] = dados["fechamento"].rolling(window=media_rapida).mean()
+    dados["media_lenta"] = dados["fechamento"].rolling(window=media_lenta).mean()
+
+    dados["sinal"] = 0
+    dados.loc[(dados["media_rapida"] > dados["media_lenta"]) & (dados["media_rapida"].shift(1) <= dados["media_lenta"].shift(1)), "sinal"] = 1
+    dados.loc[(dados["media_rapida"] <= dados["media_lenta"]) & (dados["media_rapida"].shift(1) > dados["media_lenta"].shift(1)), "sinal"] = -1
+
+    saldo_brl = 10000
+    saldo_ativo = 0
+    historico = []
+
+    for i in range(len(dados)):
+        preco_atual = dados["fechamento"].iloc[i]
+
+        if dados["sinal"].iloc[i] == 1:
+            if saldo_brl >= valor_por_trade:
+                quantidade_comprada = valor_por_trade / preco_atual
+                saldo_ativo += quantidade_comprada * (1 - taxa)
+                saldo_brl -= valor_por_trade
+                historico.append(("compra", dados["tempo_fechamento"].iloc[i], preco_atual, valor_por_trade))
+
+        elif dados["sinal"].iloc[i] == -1:
+            valor_venda = saldo_ativo * preco_atual * (1 - taxa)
+            saldo_brl += valor_venda
+            historico.append(("venda", dados["tempo_fechamento"].iloc[i], preco_atual, valor_venda))
+            saldo_ativo = 0
+
+    saldo_final = saldo_brl + saldo_ativo * dados["fechamento"].iloc[-1]
+    return dados, historico, saldo_final
+
+
+def conferir(quantidade_series=12, candles_min=3000, candles_max=50000):
+    aleatorio = np.random.default_rng(0)
+    duracoes_legado, duracoes_novo = [], []
+    parametros = [(7, 40, 11), (3, 10, 11), (5, 20, 10000)]
+
+    for semente in range(quantidade_series):
+        dados = gerar_dados(int(aleatorio.integers(candles_min, candles_max + 1)), semente)
+        media_rapida, media_lenta, valor_por_trade = parametros[semente % len(parametros)]
+
+        inicio = time.perf_counter()
+        dados_legado, historico_legado, saldo_legado = backtest_legado(dados, media_rapida, media_lenta, valor_por_trade=valor_por_trade)
+        duracoes_legado.append(time.perf_counter() - inicio)
+
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            inicio = time.perf_counter()
+            resultados, historico = robo_cripto.backtest_estrategia(dados, media_rapida, media_lenta, valor_por_trade=valor_por_trade)
+            duracoes_novo.append(time.perf_counter() - inicio)
+
+        assert np.array_equal(dados_legado["sinal"].to_numpy(), resultados["sinal"].to_numpy()), f"sinais diferentes (série {semente})"
+        assert len(historico) == len(historico_legado), f"quantidade de operações diferente (série {semente})"
+        for operacao, legado in zip(historico, historico_legado):
+            assert operacao[:2] == legado[:2], f"operação diferente (série {semente}): {operacao} x {legado}"
+            assert np.isclose(operacao[2], legado[2], rtol=1e-12) and np.isclose(operacao[3], legado[3], rtol=1e-9), \
+                f"preço/valor diferente (série {semente}): {operacao} x {legado}"
+        assert np.isclose(resultados["patrimonio"].iloc[-1], saldo_legado, rtol=1e-9), f"saldo final diferente (série {semente})"
+
+    print(f"{quantidade_series} séries de {candles_min} a {candles_max} candles: sinais, operações e saldo final iguais ao loop original")
+    print(f"loop original: mediana {np.median(duracoes_legado) * 1000:.1f} ms | vetorizado: mediana {np.median(duracoes_novo) * 1000:.1f} ms"
+          f" ({np.median(duracoes_legado) / np.median(duracoes_novo):.0f}x)")
+#-------------------------------------------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    quantidade_series = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    candles_min = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    candles_max = int(sys.argv[3]) if len(sys.argv) > 3 else 50000
+    conferir(quantidade_series, candles_min, candles_max)
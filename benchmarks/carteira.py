@@ -0,0 +1,88 @@
+import sys
+import time
+import numpy as np
+from backtest_portfolio import backtest_portfolio
+from simulacao import calcular_medias_moveis
+
+
+# BACKTEST DA CARTEIRA: CONFERE CONTRA UMA EXECUÇÃO LINHA A LINHA E MEDE O TEMPO
+# Os históricos começam e terminam em horários diferentes (moeda listada depois / histórico baixado até antes).
+# Uso: python -m benchmarks.carteira [qtd_universos] [qtd_moedas] [qtd_candles]
+#-------------------------------------------------------------------------------------------------------------------
+def gerar_universo(quantidade_moedas, quantidade_candles, semente, duracao_ms=3600_000):
+    aleatorio = np.random.default_rng(semente)
+    velas = {}
+    moedas = []
+    for i in range(quantidade_moedas):
+        inicio = int(aleatorio.integers(0, quantidade_candles // 3))
+        fim = int(aleatorio.integers(inicio + 30, quantidade_candles + 1))
+        tempos = (np.arange(inicio, fim, dtype=np.int64) + 1) * duracao_ms - 1
+        velas[f"MOEDA{i}BRL"] = (np.exp(np.cumsum(aleatorio.normal(0, 0.02, fim - inicio))) * 100, tempos)
+        moedas.append({"codigo": f"MOEDA{i}BRL", "quantidade_moeda": float(aleatorio.uniform(0.05, 0.5))})
+    return velas, moedas
+
+
+def backtest_linha_a_linha(velas, moedas, quantidade_reservada, saldo_inicial, taxa=0.001, fracao_venda=0.99):
+    """As regras do estrategia_trade aplicadas candle a candle, cada moeda só no horário das próprias candles."""
+    tempos = np.unique(np.concatenate([velas[moeda["codigo"]][1] for moeda in moedas]))
+    estados = []
+    for moeda in moedas:
+        fechamento, tempo = velas[moeda["codigo"]]
+        medias = calcular_medias_moveis(fechamento, [1, 7, 20])
+        estados.append({"indice": dict(zip(tempo.tolist(), range(len(tempo)))), "fechamento": fechamento, "medias": medias,
+                        "comprado": False, "quantidade": 0.0, "ultimo_preco": np.nan})
+
+    saldo = saldo_inicial
+    historico = []
+    patrimonio = []
+    for tempo in tempos.tolist():
+        for moeda, estado in zip(moedas, estados):
+            i = estado["indice"].get(tempo)
+            if i is None:
+                continue
+            preco = estado["fechamento"][i]
+            estado["ultimo_preco"] = preco
+            ligeira, rapida, lenta = (estado["medias"][janela][i] for janela in (1, 7, 20))
+            if rapida > lenta and not estado["comprado"] and ligeira > lenta:
+                if saldo > quantidade_reservada:
+                    saldo -= moeda["quantidade_moeda"] * preco
+                    estado["quantidade"] += moeda["quantidade_moeda"] * (1 - taxa)
+                    estado["comprado"] = True
+                    historico.append(("compra", tempo, moeda["codigo"]))
+            elif rapida < lenta and estado["comprado"] and ligeira < lenta:
+                quantidade_venda = estado["quantidade"] * fracao_venda
+                saldo += quantidade_venda * preco * (1 - taxa)
+                estado["quantidade"] -= quantidade_venda
+                estado["comprado"] = False
+                historico.append(("venda", tempo, moeda["codigo"]))
+        patrimonio.append(saldo + sum(estado["quantidade"] * estado["ultimo_preco"] for estado in estados if estado["quantidade"]))
+    return historico, np.array(patrimonio)
+
+
+def conferir(quantidade_universos=30, quantidade_moedas=5, quantidade_candles=2000):
+    duracoes = []
+    for semente in range(quantidade_universos):
+        velas, moedas = gerar_universo(quantidade_moedas, quantidade_candles, semente)
+        for quantidade_reservada, saldo_inicial in ((0, 1000), (1150, 1300)):
+            inicio = time.perf_counter()
+            resultado = backtest_portfolio(velas, moedas, quantidade_reservada=quantidade_reservada, saldo_inicial=saldo_inicial)
+            duracoes.append(time.perf_counter() - inicio)
+
+            historico, patrimonio = backtest_linha_a_linha(velas, moedas, quantidade_reservada, saldo_inicial)
+            assert historico == [(tipo, tempo, codigo) for tipo, tempo, codigo, *_ in resultado["historico"]], f"operações diferentes (semente {semente})"
+            assert np.allclose(patrimonio, resultado["patrimonio"], rtol=1e-9), f"patrimônio diferente (semente {semente})"
+
+            # NENHUMA OPERAÇÃO DEPOIS DA ÚLTIMA CANDLE DA MOEDA
+            for _, tempo, codigo, *_ in resultado["historico"]:
+                assert tempo <= velas[codigo][1][-1], f"{codigo} operou sem candle (semente {semente})"
+
+    print(f"{quantidade_universos} universos x 2 reservas com {quantidade_moedas} moedas e até {quantidade_candles} candles: iguais à execução linha a linha")
+    print(f"backtest_portfolio: mediana {np.median(duracoes) * 1000:.2f} ms por universo")
+#-------------------------------------------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    quantidade_universos = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    quantidade_moedas = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    quantidade_candles = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    conferir(quantidade_universos, quantidade_moedas, quantidade_candles)
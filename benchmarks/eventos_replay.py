@@ -0,0 +1,53 @@
+import asyncio
+import statistics
+import time
+import numpy as np
+from fontes_klines import FonteReplay, despachar_velas_fechadas
+
+
+# BENCHMARK DO MODO POR EVENTOS SEM BINANCE
+# Uso: python -m benchmarks.eventos_replay [qtd_moedas] [qtd_candles] [velocidade]
+#-------------------------------------------------------------------------------------------------------------------
+def gerar_velas(quantidade_moedas, quantidade_candles, duracao_ms=3600_000, semente=0):
+    aleatorio = np.random.default_rng(semente)
+    tempos = (np.arange(1, quantidade_candles + 1, dtype=np.int64) * duracao_ms) - 1
+    return {
+        f"MOEDA{i}BRL": (np.cumsum(aleatorio.normal(0, 1, quantidade_candles)) + 1000, tempos)
+        for i in range(quantidade_moedas)
+    }
+
+
+def medir(quantidade_moedas=5, quantidade_candles=2000, velocidade=None):
+    velas = gerar_velas(quantidade_moedas, quantidade_candles)
+    latencias = []
+
+    def ao_fechar(codigo, evento):
+        latencias.append(time.time() * 1000 - evento["E"])
+
+    # O "E" DO EVENTO DO REPLAY É O HORÁRIO EM QUE ELE FOI EMPURRADO, ENTÃO A LATÊNCIA É EMPURRAR -> ESTRATÉGIA
+    fonte = FonteReplay(velas, velocidade)
+
+    inicio = time.perf_counter()
+    asyncio.run(_rodar(fonte, list(velas), ao_fechar))
+    duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    print(f"Moedas: {quantidade_moedas} | Candles por moeda: {quantidade_candles} | Velocidade: {velocidade or 'máxima'}")
+    print(f"Eventos: {len(latencias)} em {duracao:.2f}s ({len(latencias) / duracao:.0f} eventos/s)")
+    print(f"Latência até a estratégia (ms): p50 {statistics.median(latencias):.3f} | p99 {latencias[int(len(latencias) * 0.99) - 1]:.3f} | max {latencias[-1]:.3f}")
+
+
+async def _rodar(fonte, codigos, ao_fechar):
+    await despachar_velas_fechadas(fonte, codigos, "1h", ao_fechar)
+#-------------------------------------------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    import sys
+
+    argumentos = sys.argv[1:]
+    medir(
+        quantidade_moedas=int(argumentos[0]) if len(argumentos) > 0 else 5,
+        quantidade_candles=int(argumentos[1]) if len(argumentos) > 1 else 2000,
+        velocidade=float(argumentos[2]) if len(argumentos) > 2 else None,
+    )
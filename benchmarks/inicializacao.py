@@ -0,0 +1,40 @@
+import statistics
+import subprocess
+import sys
+
+
+# BENCHMARK DO TEMPO DE IMPORT DOS MÓDULOS DO ROBÔ
+# Cada medição roda num processo novo pra não aproveitar o cache de módulos já importados.
+# Uso: python -m benchmarks.inicializacao [repeticoes]
+#-------------------------------------------------------------------------------------------------------------------
+modulos = ["robo_cripto", "ativos"]
+modulos_pesados = ["pandas", "matplotlib", "binance", "numpy", "asyncio"]   # NÃO PODEM SER CARREGADOS SÓ PELO IMPORT
+
+codigo_medicao = """
+import sys, time
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+print(duracao, ",".join(m for m in {pesados!r} if m in sys.modules))
+"""
+
+
+def medir(modulo, repeticoes=5):
+    duracoes = []
+    carregados = ""
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", codigo_medicao.format(modulo=modulo, pesados=modulos_pesados)],
+                               capture_output=True, text=True, check=True).stdout.split()
+        duracoes.append(float(saida[0]))
+        carregados = saida[1] if len(saida) > 1 else ""
+
+    print(f"import {modulo}: mediana {statistics.median(duracoes) * 1000:.1f} ms | min {min(duracoes) * 1000:.1f} ms"
+          f" | módulos pesados carregados: {carregados or 'nenhum'}")
+    return statistics.median(duracoes), carregados
+#-------------------------------------------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for modulo in modulos:
+        medir(modulo, repeticoes)
@@ -0,0 +1,89 @@
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import binance.enums  # NO ROBÔ DE VERDADE O Client JÁ CARREGOU O binance ANTES DA PRIMEIRA ORDEM
+import robo_cripto
+from benchmarks.eventos_replay import gerar_velas
+from exchange_simulada import ClienteSimulado
+
+
+# BENCHMARK DO LOOP AO VIVO (verifica_moedas + rodar_varias_moedas) CONTRA A EXCHANGE SIMULADA
+# Os arquivos de candles e os logs vão pra uma pasta temporária. Com METRICAS=1 também mostra o tempo de cada etapa.
+# Uso: python -m benchmarks.loop_simulado [qtd_moedas] [passadas] [latencia_ms] [chance_falha]
+#-------------------------------------------------------------------------------------------------------------------
+def preparar(quantidade_moedas, passadas, **opcoes_cliente):
+    """Cliente simulado novo + estado do robô zerado (candles, médias, saldos e filtros em cache)."""
+    os.chdir(tempfile.mkdtemp(prefix="loop_simulado_"))
+    os.makedirs("txt")
+
+    velas = gerar_velas(quantidade_moedas, robo_cripto.quantidade_candles + passadas + 1)
+    cliente = ClienteSimulado(velas, inicio=robo_cripto.quantidade_candles, peso_por_minuto=None, **opcoes_cliente)
+    robo_cripto.definir_cliente(cliente)
+
+    robo_cripto.armazenamentos_candles.clear()
+    robo_cripto.motores_indicadores.clear()
+    robo_cripto.saldos.atualizado_em = None
+    robo_cripto.filtros.codigos = set(velas)
+    robo_cripto.filtros.quantizadores.clear()
+    robo_cripto.filtros.atualizado_em = None
+    robo_cripto.metricas.zerar()
+
+    # ~10 BRL POR COMPRA COM OS PREÇOS DO gerar_velas (EM TORNO DE 1000)
+    robo_cripto.moedas = [{"codigo": codigo, "ativo": codigo[:-3], "quantidade_moeda": 0.01, "posicao_atual": False, "quantidade_minima_moeda": 0.001}
+                          for codigo in velas]
+    return cliente
+
+
+def rodar(passadas):
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        robo_cripto.verifica_moedas()
+        inicio = time.perf_counter()
+        robo_cripto.rodar_varias_moedas(robo_cripto.moedas, robo_cripto.periodo, pausa=0, passadas=passadas)
+        duracao = time.perf_counter() - inicio
+    robo_cripto.escritor_logs.descarregar()
+    return duracao
+
+
+def medir(quantidade_moedas=5, passadas=200, latencia_ms=0.0, chance_falha=0.0):
+    opcoes_cliente = {"latencia": latencia_ms / 1000, "chance_falha": chance_falha}
+
+    cliente = preparar(quantidade_moedas, passadas, **opcoes_cliente)
+    duracao = rodar(passadas)
+    ticks = quantidade_moedas * passadas
+    resumo_metricas = robo_cripto.metricas.resumo() if robo_cripto.metricas.ativo else None
+
+    # MEMÓRIA NUMA SEGUNDA RODADA IGUAL (O tracemalloc DEIXA O LOOP BEM MAIS LENTO)
+    preparar(quantidade_moedas, passadas, **opcoes_cliente)
+    tracemalloc.start()
+    rodar(passadas)
+    memoria_atual, memoria_pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencias = sorted(latencia * 1000 for latencia in cliente.latencias_ordens)
+    chamadas = " | ".join(f"{metodo} {quantidade}" for metodo, quantidade in sorted(cliente.chamadas.items()))
+
+    print(f"Moedas: {quantidade_moedas} | Passadas: {passadas} | Latência da API: {latencia_ms} ms | Chance de falha: {chance_falha:.1%}")
+    print(f"Ticks: {ticks} em {duracao:.2f}s ({ticks / duracao:.0f} ticks/s, {duracao / ticks * 1000:.3f} ms por tick)")
+    if latencias:
+        print(f"Candle -> ordem executada (ms): {len(latencias)} ordens | p50 {statistics.median(latencias):.3f}"
+              f" | p99 {latencias[int(len(latencias) * 0.99) - 1]:.3f} | max {latencias[-1]:.3f}")
+    else:
+        print("Nenhuma ordem executada")
+    print(f"Memória (tracemalloc): atual {memoria_atual / 1024:.0f} KiB | pico {memoria_pico / 1024:.0f} KiB")
+    print(f"Chamadas à API: {chamadas}")
+    if resumo_metricas is not None:
+        print(resumo_metricas)
+    return ticks / duracao, latencias, memoria_pico
+#-------------------------------------------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    quantidade_moedas = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    passadas = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    latencia_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    chance_falha = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+    medir(quantidade_moedas, passadas, latencia_ms, chance_falha)
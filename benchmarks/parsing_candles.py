@@ -0,0 +1,80 @@
+import statistics
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from armazenamento_candles import ArmazenamentoCandles, converter_klines
+
+
+# BENCHMARK DO pegando_dados: DATAFRAME DE 12 COLUNAS (COMO ERA) x ARRAYS TIPADOS
+# Uso: python -m benchmarks.parsing_candles [qtd_candles] [repeticoes]
+#-------------------------------------------------------------------------------------------------------------------
+def gerar_klines(quantidade, duracao_ms=3600_000, semente=0):
+    """Klines no formato do get_klines (listas com os números em string)."""
+    aleatorio = np.random.default_rng(semente)
+    fechamentos = np.cumsum(aleatorio.normal(0, 1, quantidade)) + 300000
+    klines = []
+    for i, fechamento in enumerate(fechamentos):
+        abertura = i * duracao_ms
+        klines.append([abertura, f"{fechamento:.2f}", f"{fechamento + 10:.2f}", f"{fechamento - 10:.2f}", f"{fechamento:.2f}",
+                       "1.23400000", abertura + duracao_ms - 1, "370200.00", 42, "0.61700000", "185100.00", "0"])
+    return klines
+
+
+def pegando_dados_legado(candles):
+    """O pegando_dados original, sem a chamada à Binance."""
+    precos = pd.DataFrame(candles)
+    precos.columns = ["tempo_abertura", "abertura", "maxima", "minima", "fechamento", "volume", "tempo_fechamento", "moedas_negociadas", "numero_trades",
+                    "volume_ativo_base_compra", "volume_ativo_cotação", "-"]
+    precos = precos[["fechamento", "tempo_fechamento"]]
+    precos["tempo_fechamento"] = pd.to_datetime(precos["tempo_fechamento"], unit="ms").dt.tz_localize("UTC")
+    precos["tempo_fechamento"] = precos["tempo_fechamento"].dt.tz_convert("America/Sao_Paulo")
+    return precos
+
+
+def pegando_dados_enxuto(candles):
+    fechamento, tempo_fechamento = converter_klines(candles)
+    return {"fechamento": fechamento, "tempo_fechamento": tempo_fechamento}
+
+
+def cronometrar(funcao, argumento, repeticoes):
+    duracoes = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(argumento)
+        duracoes.append(time.perf_counter() - inicio)
+    return statistics.median(duracoes)
+
+
+def medir(quantidade_candles=500, repeticoes=200):
+    klines = gerar_klines(quantidade_candles)
+
+    # A CADA TICK O ROBÔ SÓ LÊ AS ÚLTIMAS CANDLES DO HISTÓRICO LOCAL (SEM PARSING NENHUM)
+    armazenamento = ArmazenamentoCandles("BENCHBRL", "1h", pasta=tempfile.mkdtemp())
+    armazenamento.adicionar(*converter_klines(klines))
+
+    # GARANTE QUE OS DOIS CAMINHOS ENTREGAM OS MESMOS PREÇOS E TEMPOS
+    legado = pegando_dados_legado(klines)
+    enxuto = pegando_dados_enxuto(klines)
+    assert np.array_equal(pd.to_numeric(legado["fechamento"]).to_numpy(), enxuto["fechamento"])
+    assert np.array_equal(((legado["tempo_fechamento"] - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(milliseconds=1)).to_numpy(), enxuto["tempo_fechamento"])
+
+    medicoes = {
+        "legado (DataFrame 12 colunas + 2 conversões de fuso)": cronometrar(pegando_dados_legado, klines, repeticoes),
+        "enxuto (converter_klines -> arrays)": cronometrar(pegando_dados_enxuto, klines, repeticoes),
+        "histórico local (ultimas)": cronometrar(armazenamento.ultimas, quantidade_candles, repeticoes),
+    }
+
+    print(f"Candles: {quantidade_candles} | Repetições: {repeticoes}")
+    base = medicoes["legado (DataFrame 12 colunas + 2 conversões de fuso)"]
+    for nome, duracao in medicoes.items():
+        print(f"{nome}: mediana {duracao * 1e6:.1f} µs ({base / duracao:.1f}x)")
+    return medicoes
+#-------------------------------------------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    quantidade_candles = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    medir(quantidade_candles, repeticoes)
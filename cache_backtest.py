@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+import numpy as np
+
+
+# CACHE EM DISCO DOS BACKTESTS (MESMOS PREÇOS + MESMOS PARÂMETROS = MESMO RESULTADO)
+#----------------------------------------------------------------------------------------------------
+pasta_cache = "./cache_backtest"
+tamanho_maximo_cache = 256 * 1024 * 1024   # BYTES NO DISCO ANTES DE COMEÇAR A APAGAR OS MENOS USADOS
+medias_em_memoria = 32                     # MÉDIAS MÓVEIS GUARDADAS TAMBÉM NA MEMÓRIA
+#----------------------------------------------------------------------------------------------------
+
+
+def impressao_digital(precos):
+    """Hash dos preços de fechamento (float64), usado como parte da chave de tudo que vem deles."""
+    precos = np.ascontiguousarray(precos, dtype=np.float64)
+    return hashlib.blake2b(precos.tobytes(), digest_size=16).hexdigest()
+
+
+class CacheBacktest:
+    """
+    Guarda em disco o resultado de cada backtest (sinais, operações e curva de patrimônio) e as médias móveis
+    de cada janela, indexados pelo hash dos preços.
+
+    - Resultados: um .npz por (hash dos preços, parâmetros); rodar de novo com os mesmos dados e parâmetros
+      só lê o arquivo.
+    - Médias móveis: um .npy por (hash dos preços, janela), reaproveitado por qualquer backtest que use a janela.
+    - Cada leitura atualiza o horário de modificação do arquivo; quando a pasta passa de `tamanho_maximo`
+      bytes, os arquivos usados há mais tempo são apagados (LRU).
+
+    :param pasta: Pasta dos arquivos do cache.
+    :param tamanho_maximo: Tamanho máximo da pasta em bytes.
+    """
+
+    def __init__(self, pasta=pasta_cache, tamanho_maximo=tamanho_maximo_cache):
+        self.pasta = pasta
+        self.tamanho_maximo = tamanho_maximo
+        self.medias = OrderedDict()   # (hash, janela) -> array
+        os.makedirs(pasta, exist_ok=True)
+
+    # CHAVES E ARQUIVOS
+    #------------------------------------------------------------------------------------------------
+    @staticmethod
+    def chave(digital, **parametros):
+        texto = json.dumps(parametros, sort_keys=True, default=str)
+        return f"{digital}_{hashlib.blake2b(texto.encode(), digest_size=8).hexdigest()}"
+
+    def _caminho(self, nome):
+        return os.path.join(self.pasta, nome)
+
+    def _usar(self, caminho):
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+
+    def _gravar(self, caminho, gravar):
+        # GRAVA NUM TEMPORÁRIO E TROCA, PRA UM BACKTEST INTERROMPIDO NÃO DEIXAR ARQUIVO PELA METADE NO CACHE
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "wb") as arquivo:
+            gravar(arquivo)
+        os.replace(temporario, caminho)
+        self._limitar_tamanho()
+
+    def _limitar_tamanho(self):
+        arquivos = [entrada for entrada in os.scandir(self.pasta) if entrada.is_file() and not entrada.name.endswith(".tmp")]
+        total = sum(entrada.stat().st_size for entrada in arquivos)
+        for entrada in sorted(arquivos, key=lambda entrada: entrada.stat().st_mtime):
+            if total <= self.tamanho_maximo:
+                break
+            total -= entrada.stat().st_size
+            try:
+                os.remove(entrada.path)
+            except OSError:
+                pass
+    #------------------------------------------------------------------------------------------------
+
+    # MÉDIAS MÓVEIS POR JANELA
+    #------------------------------------------------------------------------------------------------
+    def media_movel(self, digital, janela, calcular):
+        """
+        :param calcular: Função sem argumentos que calcula a média se ela não estiver no cache.
+        :return: Array da média móvel da janela.
+        """
+        memoria = (digital, janela)
+        if memoria in self.medias:
+            self.medias.move_to_end(memoria)
+            return self.medias[memoria]
+
+        caminho = self._caminho(f"media_{digital}_{janela}.npy")
+        try:
+            media = np.load(caminho)
+            self._usar(caminho)
+        except (OSError, ValueError):
+            media = np.asarray(calcular(), dtype=np.float64)
+            self._gravar(caminho, lambda arquivo: np.save(arquivo, media))
+
+        self.medias[memoria] = media
+        if len(self.medias) > medias_em_memoria:
+            self.medias.popitem(last=False)
+        return media
+    #------------------------------------------------------------------------------------------------
+
+    # RESULTADOS DOS BACKTESTS
+    #------------------------------------------------------------------------------------------------
+    def buscar(self, chave):
+        """:return: Dicionário com os arrays guardados ou None se a chave não estiver no cache."""
+        caminho = self._caminho(f"backtest_{chave}.npz")
+        try:
+            with np.load(caminho) as arquivo:
+                resultado = {nome: arquivo[nome] for nome in arquivo.files}
+        except (OSError, ValueError, KeyError):
+            return None
+        self._usar(caminho)
+        return resultado
+
+    def guardar(self, chave, resultado):
+        """:param resultado: Dicionário nome -> array (ou número)."""
+        caminho = self._caminho(f"backtest_{chave}.npz")
+        self._gravar(caminho, lambda arquivo: np.savez(arquivo, **resultado))
+    #------------------------------------------------------------------------------------------------
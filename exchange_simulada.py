@@ -0,0 +1,197 @@
+import bisect
+import json
+import random
+import threading
+import time
+from collections import deque
+from decimal import Decimal
+from limitador import pesos_requisicoes, peso_maximo_por_minuto
+
+
+# ERRO NO MESMO FORMATO DA BinanceAPIException (status_code, code, message)
+#----------------------------------------------------------------------------------------------------
+class ErroSimulado(Exception):
+    def __init__(self, status_code, code, message):
+        super().__init__(f"APIError(code={code}): {message}")
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+#----------------------------------------------------------------------------------------------------
+
+
+class ClienteSimulado:
+    """
+    Substituto offline do binance.client.Client com os métodos que o robô usa: get_account, get_klines,
+    get_symbol_info, get_exchange_info, get_symbol_ticker e create_order.
+
+    - Reproduz candles gravadas: cada get_klines de um par avança `candles_por_chamada` candles no replay dele,
+      então o robô enxerga o mercado andando a cada passada.
+    - Ordens a mercado são executadas no fechamento da candle atual, com a taxa descontada do que foi recebido,
+      e mexem nos saldos devolvidos pelo get_account.
+    - Injeta latência (`latencia` + até `variacao` segundos), erros de limite (-1003, HTTP 429) com chance
+      `chance_limite` ou quando o peso passa de `peso_por_minuto` (None = sem limite), e falhas (-1001, HTTP 500) com chance `chance_falha`.
+
+    Parâmetros:
+    - velas: Dicionário codigo -> (fechamento, tempo_fechamento em ms).
+    - saldos: Dicionário ativo -> saldo livre inicial (default 100000 BRL).
+    - filtros: Dicionário codigo -> lista `filters` (default: stepSize/minQty 0.00000001 e mínimo de 1 BRL).
+    - inicio: Quantidade de candles já "no passado" quando o replay começa (o get_klines sem startTime devolve elas).
+    """
+
+    def __init__(self, velas, saldos=None, filtros=None, taxa=0.001, moeda_cotacao="BRL", inicio=500, candles_por_chamada=1,
+                 latencia=0.0, variacao=0.0, chance_limite=0.0, chance_falha=0.0, peso_por_minuto=peso_maximo_por_minuto, semente=0):
+        self.velas = {codigo: (list(map(float, fechamento)), list(map(int, tempo))) for codigo, (fechamento, tempo) in velas.items()}
+        self.saldos = {ativo: Decimal(str(valor)) for ativo, valor in (saldos or {moeda_cotacao: 100000}).items()}
+        self.filtros = filtros or {}
+        self.taxa = Decimal(str(taxa))
+        self.moeda_cotacao = moeda_cotacao
+        self.candles_por_chamada = candles_por_chamada
+        self.cursores = {codigo: min(inicio, len(fechamento)) - 1 for codigo, (fechamento, _) in self.velas.items()}
+
+        self.latencia = latencia
+        self.variacao = variacao
+        self.chance_limite = chance_limite
+        self.chance_falha = chance_falha
+        self.peso_por_minuto = peso_por_minuto
+        self.aleatorio = random.Random(semente)
+
+        self.trava = threading.Lock()
+        self.pesos_usados = deque()  # (horário, peso) das chamadas do último minuto
+        self.peso_ultimo_minuto = 0
+        self.chamadas = {}
+        self.ordens = []
+        self.entregas = {}           # codigo -> perf_counter da última candle entregue pelo get_klines
+        self.latencias_ordens = []   # segundos entre a candle chegar no robô e a ordem ser executada
+        self.proximo_id = 1
+
+    # INJEÇÃO DE LATÊNCIA/ERROS E CONTROLE DE PESO
+    #------------------------------------------------------------------------------------------------
+    def _chamar(self, metodo):
+        if self.latencia or self.variacao:
+            time.sleep(self.latencia + self.aleatorio.uniform(0, self.variacao))
+
+        agora = time.monotonic()
+        with self.trava:
+            self.chamadas[metodo] = self.chamadas.get(metodo, 0) + 1
+            while self.pesos_usados and agora - self.pesos_usados[0][0] >= 60:
+                self.peso_ultimo_minuto -= self.pesos_usados.popleft()[1]
+            peso = pesos_requisicoes.get(metodo, 1)
+            self.pesos_usados.append((agora, peso))
+            self.peso_ultimo_minuto += peso
+            passou_do_limite = self.peso_por_minuto is not None and self.peso_ultimo_minuto > self.peso_por_minuto
+            sorteio = self.aleatorio.random()
+
+        if passou_do_limite or sorteio < self.chance_limite:
+            raise ErroSimulado(429, -1003, "Too much request weight used; current limit is 6000 request weight per 1 MINUTE.")
+        if sorteio < self.chance_limite + self.chance_falha:
+            raise ErroSimulado(500, -1001, "Internal error; unable to process your request. Please try again.")
+
+    def _ativo(self, codigo):
+        return codigo[:-len(self.moeda_cotacao)]
+
+    def _preco(self, codigo):
+        fechamento, _ = self.velas[codigo]
+        return fechamento[max(self.cursores[codigo], 0)]
+
+    def _filtros(self, codigo):
+        return self.filtros.get(codigo) or [
+            {"filterType": "PRICE_FILTER", "minPrice": "0.01000000", "maxPrice": "10000000.00000000", "tickSize": "0.01000000"},
+            {"filterType": "LOT_SIZE", "minQty": "0.00000001", "maxQty": "9000000.00000000", "stepSize": "0.00000001"},
+            {"filterType": "NOTIONAL", "minNotional": "1.00000000", "applyMinToMarket": True},
+        ]
+    #------------------------------------------------------------------------------------------------
+
+    # MERCADO
+    #------------------------------------------------------------------------------------------------
+    def get_klines(self, symbol, interval, limit=500, startTime=None, endTime=None):
+        self._chamar("get_klines")
+        if symbol not in self.velas:
+            raise ErroSimulado(400, -1121, "Invalid symbol.")
+
+        fechamento, tempo = self.velas[symbol]
+        with self.trava:
+            self.cursores[symbol] = min(self.cursores[symbol] + self.candles_por_chamada, len(fechamento) - 1)
+            fim = self.cursores[symbol] + 1
+
+        # startTime/endTime FILTRAM PELO TEMPO DE ABERTURA, IGUAL À BINANCE
+        duracao = tempo[1] - tempo[0] if len(tempo) > 1 else 60_000
+        if startTime is not None:
+            inicio = bisect.bisect_left(tempo, startTime + duracao - 1, 0, fim)
+        else:
+            inicio = max(fim - limit, 0)
+        if endTime is not None:
+            fim = bisect.bisect_right(tempo, endTime + duracao - 1, inicio, fim)
+        fim = min(fim, inicio + limit)
+
+        klines = []
+        for i in range(inicio, fim):
+            preco = f"{fechamento[i]:.8f}"
+            klines.append([tempo[i] - duracao + 1, preco, preco, preco, preco, "0.00000000", tempo[i], "0.00000000", 0, "0.00000000", "0.00000000", "0"])
+
+        self.entregas[symbol] = time.perf_counter()
+        return klines
+
+    def get_symbol_ticker(self, symbol=None, symbols=None):
+        self._chamar("get_symbol_ticker")
+        if symbol is not None:
+            return {"symbol": symbol, "price": f"{self._preco(symbol):.8f}"}
+        codigos = json.loads(symbols) if symbols is not None else list(self.velas)
+        if any(codigo not in self.velas for codigo in codigos):
+            raise ErroSimulado(400, -1121, "Invalid symbol.")
+        return [{"symbol": codigo, "price": f"{self._preco(codigo):.8f}"} for codigo in codigos]
+
+    def get_symbol_info(self, symbol):
+        self._chamar("get_symbol_info")
+        if symbol not in self.velas:
+            return None
+        return {"symbol": symbol, "status": "TRADING", "baseAsset": self._ativo(symbol), "quoteAsset": self.moeda_cotacao, "filters": self._filtros(symbol)}
+
+    def get_exchange_info(self):
+        self._chamar("get_exchange_info")
+        return {"symbols": [{"symbol": codigo, "status": "TRADING", "baseAsset": self._ativo(codigo), "quoteAsset": self.moeda_cotacao,
+                             "filters": self._filtros(codigo)} for codigo in self.velas]}
+    #------------------------------------------------------------------------------------------------
+
+    # CONTA E ORDENS
+    #------------------------------------------------------------------------------------------------
+    def get_account(self):
+        self._chamar("get_account")
+        with self.trava:
+            return {"balances": [{"asset": ativo, "free": f"{saldo:.8f}", "locked": "0.00000000"} for ativo, saldo in self.saldos.items()]}
+
+    def create_order(self, symbol, side, type, quantity, **kwargs):
+        self._chamar("create_order")
+        if symbol not in self.velas:
+            raise ErroSimulado(400, -1121, "Invalid symbol.")
+        if type != "MARKET":
+            raise ErroSimulado(400, -1116, "Invalid orderType.")
+
+        ativo = self._ativo(symbol)
+        quantidade = Decimal(str(quantity))
+        preco = Decimal(str(self._preco(symbol)))
+        valor = quantidade * preco
+
+        with self.trava:
+            if side == "BUY":
+                if self.saldos.get(self.moeda_cotacao, Decimal(0)) < valor:
+                    raise ErroSimulado(400, -2010, "Account has insufficient balance for requested action.")
+                self.saldos[self.moeda_cotacao] -= valor
+                self.saldos[ativo] = self.saldos.get(ativo, Decimal(0)) + quantidade * (1 - self.taxa)
+            elif side == "SELL":
+                if self.saldos.get(ativo, Decimal(0)) < quantidade:
+                    raise ErroSimulado(400, -2010, "Account has insufficient balance for requested action.")
+                self.saldos[ativo] -= quantidade
+                self.saldos[self.moeda_cotacao] = self.saldos.get(self.moeda_cotacao, Decimal(0)) + valor * (1 - self.taxa)
+            else:
+                raise ErroSimulado(400, -1117, "Invalid side.")
+
+            id_ordem = self.proximo_id
+            self.proximo_id += 1
+            ordem = {"symbol": symbol, "orderId": id_ordem, "transactTime": int(time.time() * 1000), "type": type, "side": side,
+                     "status": "FILLED", "origQty": f"{quantidade:.8f}", "executedQty": f"{quantidade:.8f}", "cummulativeQuoteQty": f"{valor:.8f}",
+                     "fills": [{"price": f"{preco:.8f}", "qty": f"{quantidade:.8f}", "commission": f"{valor * self.taxa:.8f}"}]}
+            self.ordens.append(ordem)
+            if symbol in self.entregas:
+                self.latencias_ordens.append(time.perf_counter() - self.entregas[symbol])
+        return ordem
+    #------------------------------------------------------------------------------------------------
@@ -0,0 +1,131 @@
+import threading
+import time
+from decimal import Decimal, ROUND_DOWN
+
+
+# REGRAS DE QUANTIDADE/PREÇO DE UM PAR, JÁ CONVERTIDAS PRA DECIMAL UMA ÚNICA VEZ
+#---------------------------------------------------------------------------------------------
+class Quantizador:
+    """
+    Guarda os filtros LOT_SIZE, PRICE_FILTER e MIN_NOTIONAL/NOTIONAL de um símbolo já convertidos pra Decimal,
+    pra arredondar e validar ordens sem nenhuma chamada de rede.
+
+    :param codigo: Código do par (ex.: BTCBRL).
+    :param filtros: Lista `filters` do get_symbol_info / get_exchange_info.
+    """
+
+    def __init__(self, codigo, filtros):
+        por_tipo = {filtro["filterType"]: filtro for filtro in filtros}
+        lote = por_tipo["LOT_SIZE"]
+        preco = por_tipo.get("PRICE_FILTER")
+        notional = por_tipo.get("NOTIONAL") or por_tipo.get("MIN_NOTIONAL")
+
+        self.codigo = codigo
+        self.step_size = Decimal(lote["stepSize"])
+        self.min_qty = Decimal(lote["minQty"])
+        self.max_qty = Decimal(lote["maxQty"])
+        self.tick_size = Decimal(preco["tickSize"]) if preco else None
+        self.min_notional = Decimal(notional["minNotional"]) if notional else Decimal(0)
+
+    @staticmethod
+    def _decimal(valor):
+        return valor if isinstance(valor, Decimal) else Decimal(str(valor))
+
+    def ajustar_quantidade(self, quantidade):
+        """Mesmo resultado do ajustar_quantidade_para_lote, com o stepSize já convertido."""
+        quantidade = self._decimal(quantidade)
+        return ((quantidade // self.step_size) * self.step_size).quantize(self.step_size, rounding=ROUND_DOWN)
+
+    def ajustar_preco(self, preco):
+        preco = self._decimal(preco)
+        if not self.tick_size:
+            return preco
+        return ((preco // self.tick_size) * self.tick_size).quantize(self.tick_size, rounding=ROUND_DOWN)
+
+    def validar(self, quantidade, preco=None):
+        """
+        Confere a quantidade (e o valor total, se o preço for passado) antes de mandar a ordem.
+
+        :raises ValueError: Se a ordem seria recusada pela Binance.
+        """
+        quantidade = self._decimal(quantidade)
+        if quantidade < self.min_qty:
+            raise ValueError(f"{self.codigo}: quantidade {quantidade} menor que o minQty {self.min_qty}")
+        if quantidade > self.max_qty:
+            raise ValueError(f"{self.codigo}: quantidade {quantidade} maior que o maxQty {self.max_qty}")
+        if preco is not None and quantidade * self._decimal(preco) < self.min_notional:
+            raise ValueError(f"{self.codigo}: valor {quantidade * self._decimal(preco)} menor que o mínimo {self.min_notional}")
+        return quantidade
+#---------------------------------------------------------------------------------------------
+
+
+# CACHE DO EXCHANGE INFO (UMA CHAMADA PRA TODOS OS PARES, RENOVADA A CADA `ttl` SEGUNDOS)
+#---------------------------------------------------------------------------------------------
+class CacheFiltros:
+    """
+    Com `iniciar_atualizacao_periodica` o exchange info é renovado numa thread e `quantizador` nunca chama a API
+    pros pares já carregados. Sem ela, o TTL vencido renova na hora; se essa renovação falhar, continua usando
+    os filtros antigos (mudam raramente) em vez de derrubar a ordem.
+
+    :param pegar_cliente: Função que devolve o cliente da Binance; só é chamada na primeira consulta.
+    :param codigos: Pares que devem ser guardados do exchange info (None = todos).
+    """
+
+    def __init__(self, pegar_cliente, codigos=None, ttl=3600):
+        self.pegar_cliente = pegar_cliente
+        self.codigos = set(codigos) if codigos is not None else None
+        self.ttl = ttl
+        self.quantizadores = {}
+        self.atualizado_em = None
+        self.atualizacao_periodica = False
+        self.trava = threading.Lock()
+
+    def atualizar(self):
+        info = self.pegar_cliente().get_exchange_info()
+        quantizadores = {
+            simbolo["symbol"]: Quantizador(simbolo["symbol"], simbolo["filters"])
+            for simbolo in info["symbols"]
+            if self.codigos is None or simbolo["symbol"] in self.codigos
+        }
+        with self.trava:
+            self.quantizadores.update(quantizadores)
+            self.atualizado_em = time.monotonic()
+
+    def iniciar_atualizacao_periodica(self, intervalo=None, ao_errar=None):
+        intervalo = intervalo if intervalo is not None else self.ttl
+        self.atualizacao_periodica = True
+
+        def rodar():
+            while True:
+                time.sleep(intervalo)
+                try:
+                    self.atualizar()
+                except Exception as e:
+                    if ao_errar is not None:
+                        ao_errar(e)
+
+        thread = threading.Thread(target=rodar, name="atualizacao_filtros", daemon=True)
+        thread.start()
+        return thread
+
+    def quantizador(self, codigo):
+        if self.atualizado_em is None:
+            self.atualizar()
+        elif not self.atualizacao_periodica and time.monotonic() - self.atualizado_em > self.ttl:
+            try:
+                self.atualizar()
+            except Exception:
+                if codigo not in self.quantizadores:
+                    raise
+
+        quantizador = self.quantizadores.get(codigo)
+        if quantizador is None:
+            # PAR FORA DA LISTA DE MOEDAS (EX.: MODO 2): BUSCA SÓ ELE E GUARDA
+            simbolo = self.pegar_cliente().get_symbol_info(codigo)
+            if simbolo is None:
+                raise KeyError(f"Símbolo {codigo} não existe na Binance")
+            quantizador = Quantizador(codigo, simbolo["filters"])
+            with self.trava:
+                self.quantizadores[codigo] = quantizador
+        return quantizador
+#---------------------------------------------------------------------------------------------
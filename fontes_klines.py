@@ -0,0 +1,174 @@
+import asyncio
+import time
+import numpy as np
+
+
+# FONTES DE EVENTOS DE KLINE
+# Toda fonte tem um método assíncrono `mensagens(codigos, intervalo)` que entrega os eventos no formato do stream
+# de kline da Binance: {"e": "kline", "E": horario_evento_ms, "s": "BTCBRL", "k": {"T": tempo_fechamento, "c": "fechamento", "x": fechou, ...}}
+#-------------------------------------------------------------------------------------------------------------------
+
+
+# STREAM DE KLINES DA BINANCE (UMA CONEXÃO COMBINADA PRA TODAS AS MOEDAS)
+#-------------------------------------------------------------------------------------------------------------------
+evento_reconectado = "reconectado"   # "e" DO EVENTO ENTREGUE DEPOIS DE CADA RECONEXÃO (AS CANDLES DO MEIO SE PERDERAM)
+
+class FonteWebsocketBinance:
+    """
+    Se a conexão cair ou a Binance mandar um erro, reconecta sozinha esperando `espera_inicial` segundos, dobrando
+    a cada falha seguida até `espera_maxima`. Depois de cada reconexão entrega {"e": "reconectado"} pra quem consome
+    completar o histórico pela API.
+
+    :param ao_desconectar: Chamado com (exceção, segundos até tentar de novo) a cada queda.
+    """
+
+    def __init__(self, api_key=None, secret_key=None, ao_desconectar=None, espera_inicial=1, espera_maxima=60):
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.ao_desconectar = ao_desconectar
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+
+    async def mensagens(self, codigos, intervalo):
+        espera = self.espera_inicial
+        conectou = False
+
+        while True:
+            try:
+                async for evento in self._conectar(codigos, intervalo):
+                    if evento is None:
+                        # CONEXÃO ABERTA: AS PRÓXIMAS FALHAS VOLTAM A ESPERAR POUCO
+                        espera = self.espera_inicial
+                        if conectou:
+                            yield {"e": evento_reconectado}
+                        conectou = True
+                        continue
+                    yield evento
+            except Exception as e:
+                if self.ao_desconectar is not None:
+                    self.ao_desconectar(e, espera)
+            await asyncio.sleep(espera)
+            espera = min(espera * 2, self.espera_maxima)
+
+    async def _conectar(self, codigos, intervalo):
+        """Uma conexão: entrega None quando ela abre e depois os eventos, até cair (levanta a exceção)."""
+        from binance import AsyncClient, BinanceSocketManager
+
+        cliente = await AsyncClient.create(self.api_key, self.secret_key)
+        try:
+            gerenciador = BinanceSocketManager(cliente)
+            streams = [f"{codigo.lower()}@kline_{intervalo}" for codigo in codigos]
+            async with gerenciador.multiplex_socket(streams) as socket:
+                yield None
+                while True:
+                    mensagem = await socket.recv()
+                    if mensagem.get("e") == "error":
+                        raise ConnectionError(mensagem.get("m", "Erro no websocket da Binance"))
+                    if "data" in mensagem:
+                        yield mensagem["data"]
+        finally:
+            await cliente.close_connection()
+#-------------------------------------------------------------------------------------------------------------------
+
+
+# REPLAY LOCAL DE CANDLES GRAVADAS (PRA TESTAR E MEDIR SEM CONEXÃO COM A BINANCE)
+#-------------------------------------------------------------------------------------------------------------------
+class FonteReplay:
+    """
+    Reproduz candles gravadas como se fossem eventos de fechamento do stream.
+
+    :param velas: Dicionário codigo -> (fechamento, tempo_fechamento) em arrays (ex.: ArmazenamentoCandles.ultimas).
+    :param velocidade: Quantas vezes mais rápido que o tempo real (3600 = uma candle de 1h por segundo).
+                       None entrega tudo o mais rápido possível.
+    """
+
+    def __init__(self, velas, velocidade=None):
+        self.velas = velas
+        self.velocidade = velocidade
+
+    @classmethod
+    def do_armazenamento(cls, armazenamentos, quantidade=None, velocidade=None):
+        velas = {}
+        for armazenamento in armazenamentos:
+            velas[armazenamento.codigo] = armazenamento.ultimas(quantidade or armazenamento.tamanho)
+        return cls(velas, velocidade)
+
+    async def mensagens(self, codigos, intervalo):
+        codigos = [codigo for codigo in codigos if codigo in self.velas]
+        if not codigos:
+            return
+
+        # JUNTA AS CANDLES DE TODAS AS MOEDAS NA ORDEM DE FECHAMENTO
+        tempos = np.concatenate([np.asarray(self.velas[codigo][1], dtype=np.int64) for codigo in codigos])
+        precos = np.concatenate([np.asarray(self.velas[codigo][0], dtype=np.float64) for codigo in codigos])
+        moedas = np.repeat(np.arange(len(codigos)), [len(self.velas[codigo][1]) for codigo in codigos])
+        ordem = np.argsort(tempos, kind="stable")
+
+        tempo_anterior = None
+        for indice in ordem:
+            tempo_fechamento = int(tempos[indice])
+
+            if self.velocidade and tempo_anterior is not None and tempo_fechamento > tempo_anterior:
+                await asyncio.sleep((tempo_fechamento - tempo_anterior) / 1000 / self.velocidade)
+            else:
+                await asyncio.sleep(0)  # DEIXA OS CONSUMIDORES RODAREM ENTRE OS EVENTOS
+            tempo_anterior = tempo_fechamento
+
+            codigo = codigos[moedas[indice]]
+            yield {
+                "e": "kline",
+                "E": time.time() * 1000,
+                "s": codigo,
+                "k": {"s": codigo, "i": intervalo, "T": tempo_fechamento, "c": str(precos[indice]), "x": True},
+            }
+#-------------------------------------------------------------------------------------------------------------------
+
+
+# DESPACHA CADA CANDLE FECHADA (x == true) PRA ESTRATÉGIA
+#-------------------------------------------------------------------------------------------------------------------
+async def despachar_velas_fechadas(fonte, codigos, intervalo, ao_fechar, ao_errar=None, ao_reconectar=None):
+    """
+    Lê os eventos da fonte e chama `ao_fechar(codigo, evento)` numa thread só quando uma candle fecha.
+
+    Cada moeda tem sua fila e sua corrotina: moedas diferentes são processadas ao mesmo tempo e as candles de
+    uma mesma moeda nunca saem de ordem. Candles ainda abertas são ignoradas.
+
+    :param ao_errar: Chamado com (codigo, exceção) se o `ao_fechar` ou o `ao_reconectar` falhar; o despacho continua.
+    :param ao_reconectar: Chamado com (codigo) numa thread, na fila da moeda, quando a fonte avisa que reconectou.
+    """
+    filas = {codigo: asyncio.Queue() for codigo in codigos}
+
+    async def consumir(codigo, fila):
+        while True:
+            evento = await fila.get()
+            if evento is None:
+                return
+            try:
+                if evento.get("e") == evento_reconectado:
+                    if ao_reconectar is not None:
+                        await asyncio.to_thread(ao_reconectar, codigo)
+                else:
+                    await asyncio.to_thread(ao_fechar, codigo, evento)
+            except Exception as e:
+                if ao_errar is None:
+                    raise
+                ao_errar(codigo, e)
+
+    consumidores = [asyncio.create_task(consumir(codigo, fila)) for codigo, fila in filas.items()]
+    try:
+        async for evento in fonte.mensagens(list(filas), intervalo):
+            if evento.get("e") == evento_reconectado:
+                for fila in filas.values():
+                    fila.put_nowait(evento)
+                continue
+            if not evento["k"]["x"]:
+                continue
+            fila = filas.get(evento["s"])
+            if fila is not None:
+                fila.put_nowait(evento)
+    finally:
+        # FONTE ACABOU (REPLAY): ESPERA AS FILAS ESVAZIAREM
+        for fila in filas.values():
+            fila.put_nowait(None)
+        await asyncio.gather(*consumidores)
+#-------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,195 @@
+import math
+from collections import deque
+
+
+# INDICADORES INCREMENTAIS
+# Todos têm a mesma interface:
+#   atualizar(preco) -> chamado quando uma candle FECHA, muda o estado em O(1)
+#   prever(preco)    -> valor que o indicador teria se a candle em andamento fechasse nesse preço (não muda o estado)
+#   valor            -> valor com as candles fechadas até agora (nan enquanto não tiver dados suficientes)
+#   reiniciar()      -> volta ao estado inicial
+#-------------------------------------------------------------------------------------------------------------------
+
+
+# MÉDIA MÓVEL SIMPLES (SOMA CORRENTE + BUFFER CIRCULAR)
+#-------------------------------------------------------------------------------------------------------------------
+class MediaMovelSimples:
+    def __init__(self, janela):
+        self.janela = janela
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.precos = deque(maxlen=self.janela)
+        self.soma = 0.0
+        self._atualizacoes = 0
+
+    def atualizar(self, preco):
+        if len(self.precos) == self.janela:
+            self.soma -= self.precos[0]
+        self.precos.append(preco)
+        self.soma += preco
+
+        # REFAZ A SOMA A CADA `janela` CANDLES PRA NÃO ACUMULAR ERRO DE PONTO FLUTUANTE (CONTINUA O(1) AMORTIZADO)
+        self._atualizacoes += 1
+        if self._atualizacoes >= self.janela:
+            self.soma = math.fsum(self.precos)
+            self._atualizacoes = 0
+
+    def prever(self, preco):
+        if len(self.precos) + 1 < self.janela:
+            return math.nan
+        saida = self.precos[0] if len(self.precos) == self.janela else 0.0
+        return (self.soma - saida + preco) / self.janela
+
+    @property
+    def valor(self):
+        if len(self.precos) < self.janela:
+            return math.nan
+        return self.soma / self.janela
+#-------------------------------------------------------------------------------------------------------------------
+
+
+# MÉDIA MÓVEL EXPONENCIAL (SEMENTE = MÉDIA SIMPLES DAS PRIMEIRAS `janela` CANDLES)
+#-------------------------------------------------------------------------------------------------------------------
+class MediaMovelExponencial:
+    def __init__(self, janela):
+        self.janela = janela
+        self.alfa = 2 / (janela + 1)
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.quantidade = 0
+        self.soma_semente = 0.0
+        self._valor = math.nan
+
+    def atualizar(self, preco):
+        self._valor = self.prever(preco)
+        if self.quantidade < self.janela:
+            self.soma_semente += preco
+        self.quantidade += 1
+
+    def prever(self, preco):
+        if self.quantidade + 1 < self.janela:
+            return math.nan
+        if self.quantidade + 1 == self.janela:
+            return (self.soma_semente + preco) / self.janela
+        return self.alfa * preco + (1 - self.alfa) * self._valor
+
+    @property
+    def valor(self):
+        return self._valor
+#-------------------------------------------------------------------------------------------------------------------
+
+
+# ÍNDICE DE FORÇA RELATIVA (SUAVIZAÇÃO DE WILDER)
+#-------------------------------------------------------------------------------------------------------------------
+class IndiceForcaRelativa:
+    def __init__(self, periodo=14):
+        self.periodo = periodo
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.ultimo_preco = None
+        self.quantidade = 0       # QTD DE VARIAÇÕES JÁ VISTAS
+        self.media_ganho = 0.0
+        self.media_perda = 0.0
+
+    def _medias_com(self, preco):
+        variacao = preco - self.ultimo_preco
+        ganho = max(variacao, 0.0)
+        perda = max(-variacao, 0.0)
+
+        if self.quantidade < self.periodo:
+            # AINDA MONTANDO A SEMENTE: MÉDIA SIMPLES DAS PRIMEIRAS `periodo` VARIAÇÕES
+            total = self.quantidade + 1
+            media_ganho = (self.media_ganho * self.quantidade + ganho) / total
+            media_perda = (self.media_perda * self.quantidade + perda) / total
+        else:
+            media_ganho = (self.media_ganho * (self.periodo - 1) + ganho) / self.periodo
+            media_perda = (self.media_perda * (self.periodo - 1) + perda) / self.periodo
+        return media_ganho, media_perda
+
+    @staticmethod
+    def _calcular(media_ganho, media_perda):
+        if media_perda == 0:
+            return 100.0 if media_ganho > 0 else 50.0
+        return 100 - 100 / (1 + media_ganho / media_perda)
+
+    def atualizar(self, preco):
+        if self.ultimo_preco is not None:
+            self.media_ganho, self.media_perda = self._medias_com(preco)
+            self.quantidade += 1
+        self.ultimo_preco = preco
+
+    def prever(self, preco):
+        if self.ultimo_preco is None or self.quantidade + 1 < self.periodo:
+            return math.nan
+        return self._calcular(*self._medias_com(preco))
+
+    @property
+    def valor(self):
+        if self.quantidade < self.periodo:
+            return math.nan
+        return self._calcular(self.media_ganho, self.media_perda)
+#-------------------------------------------------------------------------------------------------------------------
+
+
+# MOTOR DE INDICADORES DE UMA MOEDA
+#-------------------------------------------------------------------------------------------------------------------
+class MotorIndicadores:
+    """
+    Agrupa os indicadores de uma moeda e lembra qual foi a última candle fechada que eles já viram.
+
+    :param indicadores: Dicionário nome -> indicador (MediaMovelSimples, MediaMovelExponencial, IndiceForcaRelativa...).
+    """
+
+    def __init__(self, indicadores):
+        self.indicadores = indicadores
+        self.ultimo_tempo_fechamento = None
+
+    def reiniciar(self):
+        for indicador in self.indicadores.values():
+            indicador.reiniciar()
+        self.ultimo_tempo_fechamento = None
+
+    def fechar_vela(self, preco, tempo_fechamento):
+        preco = float(preco)
+        for indicador in self.indicadores.values():
+            indicador.atualizar(preco)
+        self.ultimo_tempo_fechamento = tempo_fechamento
+
+    def sincronizar(self, fechamento, tempo_fechamento):
+        """
+        Alimenta os indicadores com as candles fechadas que ainda não foram vistas.
+
+        A última posição das sequências é tratada como a candle em andamento (igual ao get_klines) e não entra
+        no estado. Só as candles novas são percorridas, do fim pro começo, então o custo é O(candles novas).
+        Se o buraco desde a última candle vista for maior que os dados recebidos, o motor recomeça do zero.
+
+        :param fechamento: Sequência de preços de fechamento.
+        :param tempo_fechamento: Sequência de tempos de fechamento (qualquer tipo comparável).
+        """
+        fim = len(fechamento) - 1
+        if fim < 0:
+            return
+
+        inicio = fim
+        while inicio > 0 and (self.ultimo_tempo_fechamento is None or tempo_fechamento[inicio - 1] > self.ultimo_tempo_fechamento):
+            inicio -= 1
+
+        if inicio == 0 and self.ultimo_tempo_fechamento is not None and fim > 0 and tempo_fechamento[0] > self.ultimo_tempo_fechamento:
+            self.reiniciar()
+
+        for i in range(inicio, fim):
+            self.fechar_vela(fechamento[i], tempo_fechamento[i])
+
+    def valores(self, preco_atual=None):
+        """
+        :param preco_atual: Preço da candle em andamento. Se for None, devolve os valores só com as candles fechadas.
+        :return: Dicionário nome -> último valor de cada indicador.
+        """
+        if preco_atual is None:
+            return {nome: indicador.valor for nome, indicador in self.indicadores.items()}
+        preco_atual = float(preco_atual)
+        return {nome: indicador.prever(preco_atual) for nome, indicador in self.indicadores.items()}
+#-------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,84 @@
+import threading
+import time
+
+
+# PESO DE CADA CHAMADA NA BINANCE (REQUEST_WEIGHT, LIMITE DE 6000 POR MINUTO POR IP)
+#----------------------------------------------------------------------------------------------------
+pesos_requisicoes = {
+    "get_klines": 2,
+    "get_account": 20,
+    "get_symbol_info": 20,   # USA O /exchangeInfo POR BAIXO
+    "get_exchange_info": 20,
+    "get_symbol_ticker": 4,  # COM symbols (LISTA) OU SEM FILTRO = 4; SÓ UM symbol = 2
+    "create_order": 1,
+}
+peso_maximo_por_minuto = 6000
+margem_seguranca = 0.8           # USA SÓ 80% DO LIMITE PRA SOBRAR PROS OUTROS PROGRAMAS/IMPREVISTOS
+#----------------------------------------------------------------------------------------------------
+
+
+class LimitadorPeso:
+    """
+    Balde de fichas (token bucket) compartilhado entre todas as moedas, medido em peso de requisição.
+
+    O balde enche `peso_por_minuto / 60` fichas por segundo até `capacidade`. Cada chamada reserva o seu peso na
+    hora, mesmo que o saldo fique negativo, e espera o tempo necessário pra dívida ser paga; assim quem chegou
+    primeiro sai primeiro, tanto nas threads (adquirir) quanto nas corrotinas (aguardar).
+    """
+
+    def __init__(self, peso_por_minuto=peso_maximo_por_minuto * margem_seguranca, capacidade=None):
+        self.taxa = peso_por_minuto / 60
+        self.capacidade = capacidade if capacidade is not None else peso_por_minuto
+        self.fichas = self.capacidade
+        self.ultimo = time.monotonic()
+        self.trava = threading.Lock()
+
+    def _reservar(self, peso):
+        with self.trava:
+            agora = time.monotonic()
+            self.fichas = min(self.capacidade, self.fichas + (agora - self.ultimo) * self.taxa)
+            self.ultimo = agora
+            self.fichas -= peso
+            if self.fichas >= 0:
+                return 0.0
+            return -self.fichas / self.taxa
+
+    def adquirir(self, peso=1):
+        espera = self._reservar(peso)
+        if espera > 0:
+            time.sleep(espera)
+
+    async def aguardar(self, peso=1):
+        import asyncio
+
+        espera = self._reservar(peso)
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+# CLIENTE DA BINANCE QUE DESCONTA O PESO DE CADA CHAMADA NO LIMITADOR
+#----------------------------------------------------------------------------------------------------
+class ClienteLimitado:
+    """
+    Repassa tudo pro cliente original; antes de cada método em `pesos_requisicoes` espera o peso dele no
+    limitador. Assim páginas extras do get_klines, ordens, get_account dos saldos e o exchangeInfo dos filtros
+    entram na conta, não só uma busca de candles por passada.
+
+    Chamado de dentro das threads (asyncio.to_thread), então usa o `adquirir` bloqueante.
+    """
+
+    def __init__(self, cliente, limitador):
+        self.cliente = cliente
+        self.limitador = limitador
+
+    def __getattr__(self, nome):
+        atributo = getattr(self.cliente, nome)
+        if nome not in pesos_requisicoes or not callable(atributo):
+            return atributo
+
+        def chamar(*args, **kwargs):
+            self.limitador.adquirir(pesos_requisicoes[nome])
+            return atributo(*args, **kwargs)
+
+        return chamar
+#----------------------------------------------------------------------------------------------------
@@ -0,0 +1,224 @@
+import bisect
+import os
+import threading
+import time
+from limitador import pesos_requisicoes
+
+
+# LIMITES DOS BALDES DO HISTOGRAMA (ms)
+#----------------------------------------------------------------------------------------------------
+limites_ms = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+#----------------------------------------------------------------------------------------------------
+
+
+class Histograma:
+    """Contagem por balde + soma e máximo, no formato do histograma do Prometheus."""
+
+    def __init__(self):
+        self.contagens = [0] * (len(limites_ms) + 1)   # ÚLTIMO BALDE = +Inf
+        self.soma = 0.0
+        self.total = 0
+        self.maximo = 0.0
+
+    def observar(self, duracao_ms):
+        self.contagens[bisect.bisect_left(limites_ms, duracao_ms)] += 1
+        self.soma += duracao_ms
+        self.total += 1
+        if duracao_ms > self.maximo:
+            self.maximo = duracao_ms
+
+    def percentil(self, fracao):
+        """Limite superior do balde onde cai o percentil (o máximo observado se for o balde +Inf)."""
+        alvo = fracao * self.total
+        acumulado = 0
+        for indice, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo and contagem:
+                return limites_ms[indice] if indice < len(limites_ms) else self.maximo
+        return 0.0
+
+
+# CRONÔMETROS USADOS NO with
+#----------------------------------------------------------------------------------------------------
+class _Cronometro:
+    __slots__ = ("metricas", "etapa", "inicio")
+
+    def __init__(self, metricas, etapa):
+        self.metricas = metricas
+        self.etapa = etapa
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *erro):
+        self.metricas.observar(self.etapa, (time.perf_counter() - self.inicio) * 1000)
+        return False
+
+
+class _CronometroDesligado:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        return False
+
+
+_desligado = _CronometroDesligado()
+#----------------------------------------------------------------------------------------------------
+
+
+class Metricas:
+    """
+    Tempos por etapa do loop do robô e contadores de chamadas/peso da API da Binance.
+
+    Desligado (padrão), `cronometrar` devolve sempre o mesmo objeto que não faz nada, então o custo no loop é só
+    o de um `with` vazio. Ligado, cada etapa alimenta um histograma de latência em ms.
+
+    - resumo(): texto com contagem, média, p50, p99 e máximo de cada etapa + peso da API por minuto.
+    - prometheus(): as mesmas métricas no formato texto do Prometheus (gravar_prometheus grava num arquivo,
+      pra ser lido pelo textfile collector do node_exporter).
+    """
+
+    def __init__(self, ativo=False):
+        self.ativo = ativo
+        self.histogramas = {}
+        self.requisicoes = {}
+        self.pesos = {}
+        self.erros = {}
+        self.trava = threading.Lock()
+        self.ultimo_resumo = (time.monotonic(), 0)   # (horário, peso total) pra calcular o peso por minuto
+
+    def ativar(self, ativo=True):
+        self.ativo = ativo
+
+    def zerar(self):
+        with self.trava:
+            self.histogramas.clear()
+            self.requisicoes.clear()
+            self.pesos.clear()
+            self.erros.clear()
+            self.ultimo_resumo = (time.monotonic(), 0)
+
+    # COLETA
+    #------------------------------------------------------------------------------------------------
+    def cronometrar(self, etapa):
+        if not self.ativo:
+            return _desligado
+        return _Cronometro(self, etapa)
+
+    def observar(self, etapa, duracao_ms):
+        with self.trava:
+            histograma = self.histogramas.get(etapa)
+            if histograma is None:
+                histograma = self.histogramas[etapa] = Histograma()
+            histograma.observar(duracao_ms)
+
+    def contar_requisicao(self, chamada, erro=False):
+        if not self.ativo:
+            return
+        with self.trava:
+            self.requisicoes[chamada] = self.requisicoes.get(chamada, 0) + 1
+            self.pesos[chamada] = self.pesos.get(chamada, 0) + pesos_requisicoes.get(chamada, 1)
+            if erro:
+                self.erros[chamada] = self.erros.get(chamada, 0) + 1
+    #------------------------------------------------------------------------------------------------
+
+    # SAÍDAS
+    #------------------------------------------------------------------------------------------------
+    def resumo(self):
+        with self.trava:
+            agora, peso_total = time.monotonic(), sum(self.pesos.values())
+            inicio, peso_anterior = self.ultimo_resumo
+            self.ultimo_resumo = (agora, peso_total)
+
+            linhas = []
+            for etapa, histograma in sorted(self.histogramas.items()):
+                if histograma.total:
+                    linhas.append(f"{etapa}: n={histograma.total} | média {histograma.soma / histograma.total:.2f} ms | p50 <= {histograma.percentil(0.5):g} ms"
+                                  f" | p99 <= {histograma.percentil(0.99):g} ms | max {histograma.maximo:.2f} ms")
+            for chamada in sorted(self.requisicoes):
+                linhas.append(f"api {chamada}: {self.requisicoes[chamada]} chamadas | peso {self.pesos[chamada]} | erros {self.erros.get(chamada, 0)}")
+
+        minutos = max(agora - inicio, 1e-9) / 60
+        linhas.append(f"peso da API: {(peso_total - peso_anterior) / minutos:.0f}/min desde o último resumo")
+        return "\n".join(linhas)
+
+    def prometheus(self):
+        linhas = ["# HELP robo_etapa_duracao_ms Duração de cada etapa do loop do robô em ms.", "# TYPE robo_etapa_duracao_ms histogram"]
+        with self.trava:
+            for etapa, histograma in sorted(self.histogramas.items()):
+                acumulado = 0
+                for limite, contagem in zip(limites_ms + ("+Inf",), histograma.contagens):
+                    acumulado += contagem
+                    linhas.append(f'robo_etapa_duracao_ms_bucket{{etapa="{etapa}",le="{limite}"}} {acumulado}')
+                linhas.append(f'robo_etapa_duracao_ms_sum{{etapa="{etapa}"}} {histograma.soma}')
+                linhas.append(f'robo_etapa_duracao_ms_count{{etapa="{etapa}"}} {histograma.total}')
+
+            for nome, ajuda, contadores in (("robo_api_requisicoes_total", "Chamadas feitas à API da Binance.", self.requisicoes),
+                                            ("robo_api_peso_total", "Peso (REQUEST_WEIGHT) consumido na API da Binance.", self.pesos),
+                                            ("robo_api_erros_total", "Chamadas à API da Binance que deram erro.", self.erros)):
+                linhas.append(f"# HELP {nome} {ajuda}")
+                linhas.append(f"# TYPE {nome} counter")
+                for chamada, valor in sorted(contadores.items()):
+                    linhas.append(f'{nome}{{chamada="{chamada}"}} {valor}')
+        return "\n".join(linhas) + "\n"
+
+    def gravar_prometheus(self, caminho):
+        # GRAVA NUM TEMPORÁRIO E TROCA, PRA QUEM LÊ NUNCA PEGAR O ARQUIVO PELA METADE
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w") as arquivo:
+            arquivo.write(self.prometheus())
+        os.replace(temporario, caminho)
+
+    def iniciar_resumo_periodico(self, intervalo=60, ao_resumir=print, caminho_prometheus=None):
+        def rodar():
+            while True:
+                time.sleep(intervalo)
+                try:
+                    ao_resumir(self.resumo())
+                    if caminho_prometheus is not None:
+                        self.gravar_prometheus(caminho_prometheus)
+                except Exception as e:
+                    print(f"Erro ao gerar o resumo das métricas: {str(e)}")
+
+        thread = threading.Thread(target=rodar, name="resumo_metricas", daemon=True)
+        thread.start()
+        return thread
+    #------------------------------------------------------------------------------------------------
+
+
+# CLIENTE DA BINANCE QUE CONTA E CRONOMETRA CADA CHAMADA
+#----------------------------------------------------------------------------------------------------
+class ClienteMedido:
+    """
+    Repassa tudo pro cliente original; os métodos em `pesos_requisicoes` viram a etapa `api.<metodo>` e somam
+    chamadas/peso nos contadores da API.
+    """
+
+    def __init__(self, cliente, metricas):
+        self.cliente = cliente
+        self.metricas = metricas
+
+    def __getattr__(self, nome):
+        atributo = getattr(self.cliente, nome)
+        if nome not in pesos_requisicoes or not callable(atributo):
+            return atributo
+
+        def chamar(*args, **kwargs):
+            with self.metricas.cronometrar(f"api.{nome}"):
+                try:
+                    resposta = atributo(*args, **kwargs)
+                except Exception:
+                    self.metricas.contar_requisicao(nome, erro=True)
+                    raise
+            self.metricas.contar_requisicao(nome)
+            return resposta
+
+        return chamar
+#----------------------------------------------------------------------------------------------------
+
+
+metricas = Metricas()
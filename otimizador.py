@@ -0,0 +1,83 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from simulacao import calcular_medias_moveis, gerar_sinais, simular_operacoes, calcular_drawdown
+
+
+# DADOS COMPARTILHADOS COM OS PROCESSOS (PREENCHIDOS UMA VEZ POR PROCESSO PELO INICIALIZADOR)
+#----------------------------------------------------------------------------------------------------
+_precos = None
+_medias = None
+
+def _inicializar_processo(precos, medias):
+    global _precos, _medias
+    _precos = precos
+    _medias = medias
+#----------------------------------------------------------------------------------------------------
+
+
+# AVALIA UM PAR DE JANELAS PRA TODAS AS TAXAS E VALORES POR TRADE (OS SINAIS SÃO OS MESMOS)
+#----------------------------------------------------------------------------------------------------
+def _avaliar_janelas(media_rapida, media_lenta, taxas, valores_por_trade, saldo_inicial):
+    sinal = gerar_sinais(_medias[media_rapida], _medias[media_lenta])
+
+    linhas = []
+    for taxa, valor_por_trade in itertools.product(taxas, valores_por_trade):
+        resultado = simular_operacoes(_precos, sinal, taxa=taxa, valor_por_trade=valor_por_trade, saldo_brl=saldo_inicial)
+        linhas.append({
+            "media_rapida": media_rapida,
+            "media_lenta": media_lenta,
+            "taxa": taxa,
+            "valor_por_trade": valor_por_trade,
+            "saldo_final": float(resultado["patrimonio"][-1]),
+            "operacoes": len(resultado["indices"]),
+            "drawdown": calcular_drawdown(resultado["patrimonio"]),
+        })
+    return linhas
+#----------------------------------------------------------------------------------------------------
+
+
+# VARREDURA DE PARÂMETROS DA ESTRATÉGIA DE CRUZAMENTO DE MÉDIAS
+#----------------------------------------------------------------------------------------------------
+def varrer_parametros(dados, medias_rapidas, medias_lentas, taxas=(0.001,), valores_por_trade=(11,), saldo_inicial=10000, processos=None):
+    """
+    Roda a mesma simulação do backtest_estrategia (sem gráfico) pra cada combinação da grade.
+
+    Todas as médias são calculadas uma única vez a partir da mesma soma acumulada dos preços e os pares de
+    janelas são distribuídos num pool de processos. O backtest_estrategia usa o rolling do pandas, então os
+    sinais são equivalentes a menos de arredondamento: em empates exatos um cruzamento pode diferir.
+
+    Parâmetros:
+    - dados: DataFrame ou dicionário do pegando_dados com 'fechamento' (ou array de preços).
+    - medias_rapidas / medias_lentas: Janelas a testar (só entram pares com rápida < lenta).
+    - taxas: Taxas da Binance a testar (0.1% = 0.001).
+    - valores_por_trade: Valores fixos em BRL por trade a testar.
+    - saldo_inicial: Saldo inicial em BRL de cada simulação.
+    - processos: Quantidade de processos (default = os.cpu_count(); 1 roda tudo no processo atual).
+
+    Retorna:
+    - DataFrame ordenado pelo saldo final (maior primeiro) com operações e drawdown máximo de cada combinação.
+    """
+    if isinstance(dados, (pd.DataFrame, dict)):
+        dados = dados["fechamento"]
+    precos = np.asarray(pd.to_numeric(dados), dtype=np.float64)
+
+    pares = [(rapida, lenta) for rapida in medias_rapidas for lenta in medias_lentas if rapida < lenta]
+    medias = calcular_medias_moveis(precos, [janela for par in pares for janela in par])
+    processos = processos or os.cpu_count() or 1
+
+    if processos == 1:
+        _inicializar_processo(precos, medias)
+        blocos = [_avaliar_janelas(rapida, lenta, taxas, valores_por_trade, saldo_inicial) for rapida, lenta in pares]
+    else:
+        with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_processo, initargs=(precos, medias)) as executor:
+            tarefas = [executor.submit(_avaliar_janelas, rapida, lenta, taxas, valores_por_trade, saldo_inicial) for rapida, lenta in pares]
+            blocos = [tarefa.result() for tarefa in tarefas]
+
+    resultados = pd.DataFrame([linha for bloco in blocos for linha in bloco])
+    if resultados.empty:
+        return resultados
+    return resultados.sort_values("saldo_final", ascending=False).reset_index(drop=True)
+#----------------------------------------------------------------------------------------------------
@@ -0,0 +1,135 @@
+import atexit
+import json
+import math
+import os
+import queue
+import threading
+import time
+
+
+# REGISTRO ESTRUTURADO (UMA LINHA JSON POR EVENTO)
+#-----------------------------------------------------------------------------------------------
+def linha_json(evento, **campos):
+    """
+    Monta uma linha JSONL com horário, tipo do evento e os campos passados (nan vira null).
+    """
+    registro = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime()), "evento": evento}
+    for nome, valor in campos.items():
+        if isinstance(valor, float) and math.isnan(valor):
+            valor = None
+        registro[nome] = valor
+    return json.dumps(registro, ensure_ascii=False, default=str) + "\n"
+#-----------------------------------------------------------------------------------------------
+
+
+class EscritorLogs:
+    """
+    Escreve os logs numa thread em segundo plano, juntando as mensagens e gravando em lote.
+
+    - As mensagens vão pra uma fila e são gravadas a cada `intervalo_descarga` segundos, um open por arquivo por lote.
+    - Arquivos em `caminhos_imediatos` (compras/vendas e erros) e chamadas com imediato=True são gravados na hora e
+      quem chamou espera a gravação terminar.
+    - Cada arquivo é rotacionado (arquivo.1, arquivo.2, ...) quando passa de `tamanho_maximo` bytes ou fica aberto
+      por mais de `idade_maxima` segundos, guardando no máximo `copias` arquivos antigos.
+    """
+
+    def __init__(self, intervalo_descarga=1.0, tamanho_maximo=10 * 1024 * 1024, idade_maxima=24 * 60 * 60, copias=5, caminhos_imediatos=()):
+        self.intervalo_descarga = intervalo_descarga
+        self.tamanho_maximo = tamanho_maximo
+        self.idade_maxima = idade_maxima
+        self.copias = copias
+        self.caminhos_imediatos = set(caminhos_imediatos)
+
+        self.fila = queue.Queue()
+        self.thread = None
+        self.trava = threading.Lock()
+        self.tamanhos = {}
+        self.inicios = {}
+
+    # API
+    #-------------------------------------------------------------------------------------------
+    def escrever(self, caminho, texto, imediato=None):
+        self._garantir_thread()
+        if imediato is None:
+            imediato = caminho in self.caminhos_imediatos
+
+        if imediato:
+            pronto = threading.Event()
+            self.fila.put((caminho, texto, pronto))
+            pronto.wait(timeout=5)
+        else:
+            self.fila.put((caminho, texto, None))
+
+    def descarregar(self):
+        if self.thread is None:
+            return
+        pronto = threading.Event()
+        self.fila.put((None, None, pronto))
+        pronto.wait(timeout=5)
+    #-------------------------------------------------------------------------------------------
+
+    # THREAD DE GRAVAÇÃO (SÓ É CRIADA NA PRIMEIRA MENSAGEM)
+    #-------------------------------------------------------------------------------------------
+    def _garantir_thread(self):
+        if self.thread is not None:
+            return
+        with self.trava:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._rodar, name="escritor_logs", daemon=True)
+                self.thread.start()
+                atexit.register(self.descarregar)
+
+    def _rodar(self):
+        pendentes = {}
+        avisar = []
+        ultima_descarga = time.monotonic()
+
+        while True:
+            try:
+                caminho, texto, pronto = self.fila.get(timeout=self.intervalo_descarga)
+                if caminho is not None:
+                    pendentes.setdefault(caminho, []).append(texto)
+                if pronto is not None:
+                    avisar.append(pronto)
+            except queue.Empty:
+                pass
+
+            if avisar or time.monotonic() - ultima_descarga >= self.intervalo_descarga:
+                self._gravar(pendentes)
+                pendentes = {}
+                ultima_descarga = time.monotonic()
+                for pronto in avisar:
+                    pronto.set()
+                avisar = []
+    #-------------------------------------------------------------------------------------------
+
+    # GRAVAÇÃO E ROTAÇÃO
+    #-------------------------------------------------------------------------------------------
+    def _gravar(self, pendentes):
+        for caminho, textos in pendentes.items():
+            try:
+                conteudo = "".join(textos)
+                self._rotacionar_se_preciso(caminho)
+                with open(caminho, "a") as arquivo:
+                    arquivo.write(conteudo)
+                self.tamanhos[caminho] += len(conteudo.encode())
+            except Exception as e:
+                print(f"Erro ao gravar log em {caminho}: {str(e)}")
+
+    def _rotacionar_se_preciso(self, caminho):
+        if caminho not in self.tamanhos:
+            self.tamanhos[caminho] = os.path.getsize(caminho) if os.path.exists(caminho) else 0
+            self.inicios[caminho] = time.time()
+
+        if self.tamanhos[caminho] < self.tamanho_maximo and time.time() - self.inicios[caminho] < self.idade_maxima:
+            return
+
+        if self.tamanhos[caminho] > 0:
+            for numero in range(self.copias - 1, 0, -1):
+                if os.path.exists(f"{caminho}.{numero}"):
+                    os.replace(f"{caminho}.{numero}", f"{caminho}.{numero + 1}")
+            os.replace(caminho, f"{caminho}.1")
+
+        self.tamanhos[caminho] = 0
+        self.inicios[caminho] = time.time()
+    #-------------------------------------------------------------------------------------------
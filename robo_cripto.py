@@ -1,11 +1,17 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import json
 import os 
+import threading
 import time 
-from binance.client import Client
-from binance.enums import *
 from dotenv import load_dotenv
 from decimal import Decimal, ROUND_DOWN
+from indicadores import MotorIndicadores, MediaMovelSimples
+from saldos import CacheSaldos
+from filtros_exchange import CacheFiltros
+from registro import EscritorLogs, linha_json
+from metricas import metricas, ClienteMedido
+
+# pandas, matplotlib, numpy, asyncio e binance são importados dentro das funções que usam,
+# pra importar este arquivo (backtest, testes, benchmarks) ser rápido e não depender da Binance
 
 
 # Definindo as chaves da API
@@ -15,6 +21,12 @@ api_key = os.getenv("API_KEY")
 secret_key = os.getenv("SECRET_KEY")
 #---------------------------------------------------------
 
+# MÉTRICAS DE LATÊNCIA POR ETAPA E PESO DA API (LIGADAS COM METRICAS=1 NO .env, DESLIGADAS NÃO CUSTAM NADA)
+#---------------------------------------------------------
+metricas.ativar(os.getenv("METRICAS", "").lower() in ("1", "true", "sim"))
+intervalo_resumo_metricas = int(os.getenv("METRICAS_INTERVALO", "60"))  # Segundos entre os resumos
+#---------------------------------------------------------
+
 
 # TESTE FUTURO TELEGRAM
 #---------------------------------------------------------
@@ -29,8 +41,33 @@ secret_key = os.getenv("SECRET_KEY")
 #---------------------------------------------------------
 
 # Inicializando o cliente da Binance
+# Só é criado quando algum modo precisa dele, importar este arquivo não acessa a rede nem exige as chaves
 #--------------------------------------------
-cliente_binance = Client(api_key, secret_key)
+cliente_binance = None
+
+def pegar_cliente():
+    global cliente_binance
+    if cliente_binance is None:
+        from binance.client import Client
+        definir_cliente(Client(api_key, secret_key))
+    return cliente_binance
+
+def definir_cliente(cliente):
+    global cliente_binance
+    cliente_binance = ClienteMedido(cliente, metricas) if metricas.ativo else cliente
+
+def limitar_cliente(limitador):
+    # TODA CHAMADA REST (CANDLES, ORDENS, SALDOS, FILTROS) PASSA A DESCONTAR O SEU PESO NO LIMITADOR
+    global cliente_binance
+    from limitador import ClienteLimitado
+
+    cliente = pegar_cliente()
+    if isinstance(cliente, ClienteLimitado):
+        if cliente.limitador is limitador:
+            return cliente
+        cliente = cliente.cliente
+    cliente_binance = ClienteLimitado(cliente, limitador)
+    return cliente_binance
 #--------------------------------------------
 
 # PARÂMETROS INICIALIZAÇÃO
@@ -45,8 +82,8 @@ media_movel_lenta = 20
 
 
 # Período das candles
-periodo = Client.KLINE_INTERVAL_1HOUR
-# periodo = Client.KLINE_INTERVAL_30MINUTE
+periodo = "1h"      # Client.KLINE_INTERVAL_1HOUR
+# periodo = "30m"   # Client.KLINE_INTERVAL_30MINUTE
 
 # DEFININDO MOEDAS A SER NEGOCIADA
 # codigo                    : CODIGO A SER NEGOCIADO (BTCBRL)
@@ -68,21 +105,58 @@ moedas = [
 #-----------------------------------------------------------
 pasta_arquivo_erro = "./txt/r_erros_moedas.txt"                 # LOGS DE ERROS
 pasta_arquivo_compras_e_vendas = "./txt/r_compra_vendas.txt"    # COMPRAS E VENDAS
-pasta_arquivo_aviso_media_ligeira = "./txt/r_media_ligeira.txt" # MEDIA LIGEIRA
-pasta_arquivo_logs_medias = "./txt/r_logs.txt"                  # LOGS DAS MEDIAS
+pasta_arquivo_logs_medias = "./txt/r_logs.jsonl"                # LOGS DAS MEDIAS E EVENTOS (UM JSON POR LINHA)
 pasta_arquivo_infos_iniciadas = "./txt/r_infos_iniciadas.txt"   # INICIALIZAÇÕES DE CÓDIGO
+pasta_arquivo_metricas = "./txt/metricas.prom"                  # MÉTRICAS NO FORMATO DO PROMETHEUS
 #-----------------------------------------------------------
 
-# INICIALIZANDO BINANCE
+# INICIALIZANDO BINANCE (SALDOS INDEXADOS POR ATIVO, BUSCADOS NA PRIMEIRA CONSULTA E RENOVADOS APÓS CADA ORDEM)
 #------------------------------------
-conta = cliente_binance.get_account()
+saldos = CacheSaldos(pegar_cliente)
+intervalo_atualizacao_saldos = 60  # Segundos entre atualizações automáticas dos saldos nos modos de execução
+
+# FILTROS DE LOTE/PREÇO DAS MOEDAS (CARREGADOS DE UMA VEZ NO INÍCIO DOS MODOS DE EXECUÇÃO, VALEM 1 HORA)
+filtros = CacheFiltros(pegar_cliente, [moeda["codigo"] for moeda in moedas])
 #------------------------------------
 
 # FUNÇÃO PARA LOGS
+# Gravados em lote por uma thread em segundo plano; compras/vendas e erros são gravados na hora
+#----------------------------------------------
+escritor_logs = EscritorLogs(caminhos_imediatos=[pasta_arquivo_erro, pasta_arquivo_compras_e_vendas])
+
+def log(caminho_arquivo, mensagem, imediato=None):
+    with metricas.cronometrar("log"):
+        escritor_logs.escrever(caminho_arquivo, f"{mensagem}", imediato)
+
+def registrar(evento, imediato=False, **campos):
+    with metricas.cronometrar("log"):
+        escritor_logs.escrever(pasta_arquivo_logs_medias, linha_json(evento, **campos), imediato)
+#----------------------------------------------
+
+
+# RESUMO PERIÓDICO DAS MÉTRICAS (SÓ SE ESTIVEREM LIGADAS)
 #----------------------------------------------
-def log(caminho_arquivo, mensagem):
-    with open(caminho_arquivo, "a") as arquivo:
-        arquivo.write(f"{mensagem}")
+def mostrar_resumo_metricas(resumo):
+    horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    print(f"[{horario_atual}] --------- MÉTRICAS ---------\n{resumo}")
+
+def iniciar_metricas():
+    if metricas.ativo:
+        metricas.iniciar_resumo_periodico(intervalo_resumo_metricas, ao_resumir=mostrar_resumo_metricas, caminho_prometheus=pasta_arquivo_metricas)
+#----------------------------------------------
+
+
+# ERRO NA ATUALIZAÇÃO AUTOMÁTICA DOS SALDOS E DOS FILTROS
+#----------------------------------------------
+def erro_atualizar_saldos(e):
+    horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    print(f"[{horario_atual}] Erro ao atualizar saldos: {str(e)}")
+    log(pasta_arquivo_erro, f"[{horario_atual}] Erro ao atualizar saldos: {str(e)}\n")
+
+def erro_atualizar_filtros(e):
+    horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    print(f"[{horario_atual}] Erro ao atualizar filtros da exchange: {str(e)}")
+    log(pasta_arquivo_erro, f"[{horario_atual}] Erro ao atualizar filtros da exchange: {str(e)}\n")
 #----------------------------------------------
 
 
@@ -91,19 +165,19 @@ def log(caminho_arquivo, mensagem):
 def verifica_moedas():
     for moeda in moedas:
         try:
-            for ativo in conta["balances"]:
-                if ativo["asset"] == moeda["ativo"]:
-                    
-                    # SE A QTD POSSUIDA FOR MAIOR QUE A QTD MINIMA O ATIVO FICA COMO COMPRADO
-                    #-------------------------------------------------------------------------------------------------------------------------------------------
-                    if float(ativo["free"]) > moeda["quantidade_minima_moeda"]:
-                        moeda["posicao_atual"] = True
-                        log(pasta_arquivo_infos_iniciadas, f"[{moeda['codigo']}]: QtdDisponivel: [{ativo["free"]}] logo posição: [{moeda["posicao_atual"]}] \n")
+            if moeda["ativo"] in saldos:
+                quantidade_disponivel = saldos.livre(moeda["ativo"])
 
-                    else:
-                        moeda["posicao_atual"] = False
-                        log(pasta_arquivo_infos_iniciadas, f"[{moeda['codigo']}]: QtdDisponivel: [{ativo["free"]}] logo posição: [{moeda["posicao_atual"]}] \n")
-                    #-------------------------------------------------------------------------------------------------------------------------------------------
+                # SE A QTD POSSUIDA FOR MAIOR QUE A QTD MINIMA O ATIVO FICA COMO COMPRADO
+                #-------------------------------------------------------------------------------------------------------------------------------------------
+                if float(quantidade_disponivel) > moeda["quantidade_minima_moeda"]:
+                    moeda["posicao_atual"] = True
+                    log(pasta_arquivo_infos_iniciadas, f"[{moeda['codigo']}]: QtdDisponivel: [{quantidade_disponivel}] logo posição: [{moeda['posicao_atual']}] \n")
+
+                else:
+                    moeda["posicao_atual"] = False
+                    log(pasta_arquivo_infos_iniciadas, f"[{moeda['codigo']}]: QtdDisponivel: [{quantidade_disponivel}] logo posição: [{moeda['posicao_atual']}] \n")
+                #-------------------------------------------------------------------------------------------------------------------------------------------
 
         except Exception as e:
             horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
@@ -111,24 +185,170 @@ def verifica_moedas():
             log(pasta_arquivo_erro, f"[{horario_atual}] Erro em {moeda['codigo']}: {str(e)}\n")
 #-----------------------------------------------------------------------------------------------------------------------------------------------------------------            
 
+# HISTÓRICO LOCAL DE CANDLES POR (CODIGO, INTERVALO)
+#-------------------------------------------------------------------------------------------------------------------------------------------------------------
+quantidade_candles = 500  # Quantidade de candles entregues pra estratégia (mesmo limit que era pedido pro get_klines)
+armazenamentos_candles = {}
+
+def pegar_armazenamento(codigo, intervalo):
+    chave = (codigo, intervalo)
+    if chave not in armazenamentos_candles:
+        from armazenamento_candles import ArmazenamentoCandles
+        armazenamentos_candles[chave] = ArmazenamentoCandles(codigo, intervalo)
+    return armazenamentos_candles[chave]
+#-------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+# Dados já salvos localmente, sem chamar a Binance
+# Só fechamento (float64) e tempo_fechamento (int64 em ms UTC), sem DataFrame; o fuso de São Paulo só entra pra mostrar
+#-------------------------------------------------------------------------------------------------------------------------------------------------------------
+fuso_horario = "America/Sao_Paulo"
+
+def dados_armazenados(codigo, intervalo):
+    fechamento, tempo_fechamento = pegar_armazenamento(codigo, intervalo).ultimas(quantidade_candles)
+    return {"fechamento": fechamento, "tempo_fechamento": tempo_fechamento}
+
+def dados_vazios():
+    import numpy as np
+    return {"fechamento": np.empty(0, dtype=np.float64), "tempo_fechamento": np.empty(0, dtype=np.int64)}
+
+def horario_local(tempo_ms):
+    from datetime import datetime
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+    try:
+        fuso = ZoneInfo(fuso_horario)
+    except ZoneInfoNotFoundError:
+        fuso = None  # Windows sem o pacote tzdata: usa o fuso da máquina
+    return datetime.fromtimestamp(int(tempo_ms) / 1000, fuso).strftime("%Y-%m-%d %H:%M:%S")
+
+def dados_para_dataframe(dados):
+    import pandas as pd
+
+    tempo_fechamento = pd.to_datetime(dados["tempo_fechamento"], unit="ms", utc=True).tz_convert(fuso_horario)
+    return pd.DataFrame({"fechamento": dados["fechamento"], "tempo_fechamento": tempo_fechamento})
+#-------------------------------------------------------------------------------------------------------------------------------------------------------------
+
 # Função para pegar os dados de mercado (candles)
+# Só baixa da Binance as candles mais novas que a última salva, o resto vem do histórico local
 #-------------------------------------------------------------------------------------------------------------------------------------------------------------
 def pegando_dados(codigo, intervalo):
     try:
-        candles = cliente_binance.get_klines(symbol=codigo, interval=intervalo, limit=500)
-        precos = pd.DataFrame(candles)
-        precos.columns = ["tempo_abertura", "abertura", "maxima", "minima", "fechamento", "volume", "tempo_fechamento", "moedas_negociadas", "numero_trades",
-                        "volume_ativo_base_compra", "volume_ativo_cotação", "-"]
-        precos = precos[["fechamento", "tempo_fechamento"]]
-        precos["tempo_fechamento"] = pd.to_datetime(precos["tempo_fechamento"], unit="ms").dt.tz_localize("UTC")
-        precos["tempo_fechamento"] = precos["tempo_fechamento"].dt.tz_convert("America/Sao_Paulo")
-        return precos
+        with metricas.cronometrar("buscar_candles"):
+            pegar_armazenamento(codigo, intervalo).atualizar(pegar_cliente())
+        with metricas.cronometrar("ler_candles"):
+            return dados_armazenados(codigo, intervalo)
     except Exception as e:
         horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
         print(f"[{horario_atual}] Erro ao pegar dados para {codigo}: {str(e)}")
         log(pasta_arquivo_erro, f"[{horario_atual}] Erro ao pegar dados para {codigo}: {str(e)}\n")
 
-        return pd.DataFrame()  # Retorna um DataFrame vazio para evitar erros subsequentes
+        return dados_vazios()  # Retorna arrays vazios para evitar erros subsequentes
+#-------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+
+# MOTOR DE MÉDIAS MÓVEIS INCREMENTAIS POR MOEDA
+#-------------------------------------------------------------------------------------------------------------------------------------------------------------
+motores_indicadores = {}
+
+def pegar_motor_indicadores(codigo):
+    if codigo not in motores_indicadores:
+        motores_indicadores[codigo] = MotorIndicadores({
+            "media_ligeira": MediaMovelSimples(media_movel_ligeira),
+            "media_rapida": MediaMovelSimples(media_movel_rapida),
+            "media_devagar": MediaMovelSimples(media_movel_lenta),
+        })
+    return motores_indicadores[codigo]
+#-------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+
+# ORDENS DE COMPRA E VENDA (USADAS PELO estrategia_trade E PELO MODO EM LOTE)
+#-------------------------------------------------------------------------------------------------------------------------------------------------------------
+# NO MODO ASYNC CADA MOEDA RODA NUMA THREAD: SEM A TRAVA DUAS COMPRAS PODEM PASSAR PELA RESERVA COM O MESMO SALDO
+trava_ordens = threading.Lock()
+
+def atualizar_saldos_apos_ordem(ativo_operado):
+    """
+    Renova os saldos depois de uma ordem que já foi executada e devolve o BRL livre.
+
+    Se o get_account falhar, a ordem continua registrada: o erro vai pro log e o cache fica marcado como velho,
+    então a próxima consulta (ou a atualização periódica) busca a conta de novo. Nesse caso devolve None.
+    """
+    try:
+        saldos.atualizar()
+        return saldos.livre("BRL")
+    except Exception as e:
+        saldos.invalidar()
+        horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        print(f"[{horario_atual}] Erro ao atualizar saldos após a ordem de {ativo_operado}: {str(e)}")
+        log(pasta_arquivo_erro, f"[{horario_atual}] Erro ao atualizar saldos após a ordem de {ativo_operado}: {str(e)}\n")
+        return None
+
+def comprar(moeda, medias):
+    from binance.enums import SIDE_BUY, ORDER_TYPE_MARKET
+
+    codigo_ativo = moeda["codigo"]
+    ativo_operado = moeda["ativo"]
+    quantidade_moeda = round(Decimal(moeda["quantidade_moeda"]),8)
+    horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+
+    with trava_ordens:
+        # VERIFICANDO SALDO SE É POSSÍVEL COMPRAR MAIS OU NÃO
+        #------------------------------------------------------
+        with metricas.cronometrar("saldo"):
+            qtd_BRL = saldos.livre("BRL")
+        pode_comprar = float(qtd_BRL) > quantidade_reservada
+        #------------------------------------------------------
+
+        if pode_comprar:
+            print(quantidade_moeda)
+            with metricas.cronometrar("ordem"):
+                order = pegar_cliente().create_order(symbol=codigo_ativo, side=SIDE_BUY, type=ORDER_TYPE_MARKET, quantity=quantidade_moeda)
+
+            print(f"[{horario_atual}] COMPROU {ativo_operado}!")
+
+            moeda["posicao_atual"] = True
+            log(pasta_arquivo_compras_e_vendas,f"[{horario_atual}] COMPROU O ATIVO [{ativo_operado}]\n")
+
+            saldo_brl = atualizar_saldos_apos_ordem(ativo_operado)
+            log(pasta_arquivo_compras_e_vendas, f"[{horario_atual}] Após compra [{ativo_operado}]: {saldo_brl}\n")
+            registrar("compra", imediato=True, codigo=codigo_ativo, ativo=ativo_operado, quantidade=quantidade_moeda, saldo_brl=saldo_brl,
+                      media_ligeira=medias["media_ligeira"], media_rapida=medias["media_rapida"], media_devagar=medias["media_devagar"])
+    return moeda
+
+
+def vender(moeda, medias, preco_atual):
+    from binance.enums import SIDE_SELL, ORDER_TYPE_MARKET
+
+    codigo_ativo = moeda["codigo"]
+    ativo_operado = moeda["ativo"]
+    horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+
+    # VERIFICANDO QUANTIDADE ATUAL PRA VENDER
+    #------------------------------------------------------
+    with metricas.cronometrar("saldo"):
+        quantidade_atual = Decimal(saldos.livre(ativo_operado))
+    #------------------------------------------------------
+
+    with metricas.cronometrar("filtros"):
+        quantizador = filtros.quantizador(codigo_ativo)
+    quantidade_venda = round(quantizador.ajustar_quantidade(quantidade_atual * Decimal(0.99)),8)
+    print('quantidade_venda', quantidade_venda)
+    quantizador.validar(quantidade_venda, preco_atual)
+
+    with trava_ordens:
+        with metricas.cronometrar("ordem"):
+            order = pegar_cliente().create_order(symbol=codigo_ativo, side=SIDE_SELL, type=ORDER_TYPE_MARKET, quantity=quantidade_venda)
+        print(f"[{horario_atual}] VENDEU {ativo_operado}!")
+        moeda["posicao_atual"] = False
+        log(pasta_arquivo_compras_e_vendas, f"[{horario_atual}] VENDEU ATIVO [{ativo_operado}] qtd: [{quantidade_venda}]\n")
+
+        saldo_brl = atualizar_saldos_apos_ordem(ativo_operado)
+
+    # Verificando saldo após a venda
+    log(pasta_arquivo_compras_e_vendas, f"[{horario_atual}] Após venda (BRL): {saldo_brl}\n")
+    registrar("venda", imediato=True, codigo=codigo_ativo, ativo=ativo_operado, quantidade=quantidade_venda, saldo_brl=saldo_brl,
+              media_ligeira=medias["media_ligeira"], media_rapida=medias["media_rapida"], media_devagar=medias["media_devagar"])
+    return moeda
 #-------------------------------------------------------------------------------------------------------------------------------------------------------------
 
 
@@ -139,102 +359,53 @@ def estrategia_trade(dados, moeda):
         #----------------------------------------------------------------------
         codigo_ativo = moeda["codigo"]
         ativo_operado = moeda["ativo"]
-        quantidade_moeda = round(Decimal(moeda["quantidade_moeda"]),8)
         posicao = moeda["posicao_atual"]
         #----------------------------------------------------------------------
 
         # PEGAR MEDIAS MOVEIS DOS DADOS ANTIGOS
         #------------------------------------------------------------------------------------
-        horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-        dados["media_ligeira"] = dados["fechamento"].rolling(window=media_movel_ligeira).mean()
-        dados["media_rapida"] = dados["fechamento"].rolling(window=media_movel_rapida).mean()
-        dados["media_devagar"] = dados["fechamento"].rolling(window=media_movel_lenta).mean()
-        
-        ultima_media_ligeira = dados["media_ligeira"].iloc[-1]
-        ultima_media_rapida = dados["media_rapida"].iloc[-1]
-        ultima_media_devagar = dados["media_devagar"].iloc[-1]
+        # SÓ AS CANDLES QUE FECHARAM DESDE A ÚLTIMA CHAMADA ENTRAM NO MOTOR, A ÚLTIMA LINHA É A CANDLE EM ANDAMENTO
+        fechamento = dados["fechamento"]
+        tempo_fechamento = dados["tempo_fechamento"]
+        with metricas.cronometrar("indicadores"):
+            motor = pegar_motor_indicadores(codigo_ativo)
+            motor.sincronizar(fechamento, tempo_fechamento)
+            medias = motor.valores(fechamento[-1])
+
+        ultima_media_ligeira = medias["media_ligeira"]
+        ultima_media_rapida = medias["media_rapida"]
+        ultima_media_devagar = medias["media_devagar"]
         #------------------------------------------------------------------------------------
 
 
-        # IMPRIMIR AS MÉDIAS
+        # TENDÊNCIA DA MÉDIA LIGEIRA (MA1 ACIMA OU ABAIXO DE TODAS)
+        #---------------------------------------------------------------------------------------------------
+        if ultima_media_ligeira > ultima_media_devagar and ultima_media_ligeira > ultima_media_rapida:
+            tendencia = "alta"
+        elif ultima_media_ligeira < ultima_media_devagar and ultima_media_ligeira < ultima_media_rapida:
+            tendencia = "baixa"
+        else:
+            tendencia = None
+        #---------------------------------------------------------------------------------------------------
+
+        # IMPRIMIR AS MÉDIAS (UM ÚNICO REGISTRO POR TICK COM AS MÉDIAS E A TENDÊNCIA)
         #-----------------------------------------------------------------------------------------------------------------------------------------------------------------
         print(f"[{ativo_operado}] Última Média Ligeira: {ultima_media_ligeira} | Última Média Rápida: {ultima_media_rapida} | Última Média Devagar: {ultima_media_devagar}")
-        log(pasta_arquivo_logs_medias, f"[{horario_atual}] [{ativo_operado}] Última Média Ligeira: {ultima_media_ligeira} | Última Média Rápida: {ultima_media_rapida} | Última Média Devagar: {ultima_media_devagar}\n")
+        registrar("medias", codigo=codigo_ativo, ativo=ativo_operado, candle=horario_local(tempo_fechamento[-1]), media_ligeira=ultima_media_ligeira,
+                  media_rapida=ultima_media_rapida, media_devagar=ultima_media_devagar, tendencia=tendencia, posicao=posicao)
         #-----------------------------------------------------------------------------------------------------------------------------------------------------------------
         
-        # VARIÁVEIS ALEATÓRIAS NECESSÁRIAS
-        #---------------------------------
-        quantidade_atual = 0
-        pode_comprar = False
-        #---------------------------------
-
-        
-
         # LOGICA DE COMPRA
         #-----------------------------------------------------------------------------------------------------------------------------------------------------------------
         if ultima_media_rapida > ultima_media_devagar and not posicao and ultima_media_ligeira > ultima_media_devagar:
-            
-            # VERIFICANDO SALDO SE É POSSÍVEL COMPRAR MAIS OU NÃO
-            # VERIFICANDO A QUANTIDADE ATUAL DE ATIVOS DA MOEDA PASSADA
-            #------------------------------------------------------
-            for ativo in conta["balances"]:
-                if ativo["asset"] == 'BRL':
-                    qtd_BRL = ativo["free"]
-                    if float(ativo["free"]) > quantidade_reservada:
-                        pode_comprar = True
-                    else:
-                        pode_comprar = False
-            #------------------------------------------------------
-
-            if pode_comprar:
-                print(quantidade_moeda)
-                order = cliente_binance.create_order(symbol=codigo_ativo, side=SIDE_BUY, type=ORDER_TYPE_MARKET, quantity=quantidade_moeda)
-                
-                print(f"[{horario_atual}] COMPROU {ativo_operado}!")
-                
-                moeda["posicao_atual"] = True
-                
-                log(pasta_arquivo_compras_e_vendas,f"[{horario_atual}] COMPROU O ATIVO [{ativo_operado}]\n")
-                
-                log(pasta_arquivo_compras_e_vendas, f"[{horario_atual}] Após compra [{ativo_operado}]: {qtd_BRL}\n")
+            comprar(moeda, medias)
         #-----------------------------------------------------------------------------------------------------------------------------------------------------------------
 
         # LOGICA DE VENDA
         #-----------------------------------------------------------------------------------------------------------------------------------------------------------------
         elif ultima_media_rapida < ultima_media_devagar and posicao and ultima_media_ligeira < ultima_media_devagar:
-
-            # VERIFICANDO QUANTIDADE ATUAL PRA VENDER
-            #------------------------------------------------------
-            for ativo in conta["balances"]:
-                if ativo["asset"] == ativo_operado:
-                    quantidade_atual = Decimal(ativo["free"])
-                time.sleep(0.1)
-            #------------------------------------------------------
-
-            symbol_info = cliente_binance.get_symbol_info(codigo_ativo)
-            step_size = next(f for f in symbol_info['filters'] if f['filterType'] == 'LOT_SIZE')['stepSize']
-            quantidade_venda = round(Decimal(ajustar_quantidade_para_lote(quantidade_atual * Decimal(0.99), step_size)),8)
-            print('quantidade_venda', quantidade_venda)
-
-            order = cliente_binance.create_order(symbol=codigo_ativo, side=SIDE_SELL, type=ORDER_TYPE_MARKET, quantity=quantidade_venda)
-            print(f"[{horario_atual}] VENDEU {ativo_operado}!")
-            moeda["posicao_atual"] = False
-
-            log(pasta_arquivo_compras_e_vendas, f"[{horario_atual}] VENDEU ATIVO [{ativo_operado}] qtd: [{quantidade_venda}]\n")
-
-
-            # Verificando saldo após a venda
-            for ativo in conta["balances"]:
-                if ativo["asset"] == 'BRL':
-                    log(pasta_arquivo_compras_e_vendas, f"[{horario_atual}] Após venda (BRL): {ativo['free']}\n")
+            vender(moeda, medias, fechamento[-1])
         #-----------------------------------------------------------------------------------------------------------------------------------------------------------------
-
-        if ultima_media_ligeira > ultima_media_devagar and ultima_media_ligeira > ultima_media_rapida:
-            log(pasta_arquivo_aviso_media_ligeira, f"[{horario_atual}] ALTA: [{ativo_operado}] MA1 MAIOR QUE TODAS | MA1: {ultima_media_ligeira} | MA7: {ultima_media_rapida} | MA20: {ultima_media_devagar}\n")
-        elif ultima_media_ligeira < ultima_media_devagar and ultima_media_ligeira < ultima_media_rapida:
-            log(pasta_arquivo_aviso_media_ligeira, f"[{horario_atual}] BAIXA: [{ativo_operado}] MA1 MENOR QUE TODAS | MA1: {ultima_media_ligeira} | MA7: {ultima_media_rapida} | MA20: {ultima_media_devagar}\n")
-        # else:
-        #     log(pasta_arquivo_aviso_media_ligeira, f"[{horario_atual}] NEUTRO: [{ativo_operado}]\n")
         
         return moeda
     
@@ -278,38 +449,217 @@ def ajustar_quantidade_para_lote(quantidade, lote):
 # Função para pegar o valor mínimo de compra
 #---------------------------------------------------------------------------------------------
 def pegar_quantidade_minima(symbol):
-    symbol_info = cliente_binance.get_symbol_info(symbol)
-    lot_size_filter = next(f for f in symbol_info['filters'] if f['filterType'] == 'LOT_SIZE')
+    quantizador = filtros.quantizador(symbol)
 
-    min_qty = Decimal(lot_size_filter['minQty'])
-    max_qty = Decimal(lot_size_filter['maxQty'])
-    step_size = Decimal(lot_size_filter['stepSize'])
-
-    print(f"Min Qty: {min_qty}, Max Qty: {max_qty}, Step Size: {step_size}")
+    print(f"Min Qty: {quantizador.min_qty}, Max Qty: {quantizador.max_qty}, Step Size: {quantizador.step_size}")
     
-    return min_qty
+    return quantizador.min_qty
 #---------------------------------------------------------------------------------------------
 
 
 # FUNÇÃO PRA RODAR A LISTA DE MOEDAS COM O INTERVALO PRÉ-DEFINIDO
 #---------------------------------------------------------------------------------------------------
-def rodar_varias_moedas(moedas, intervalo):
-    while True:
-        
+def rodar_varias_moedas(moedas, intervalo, pausa=2, passadas=None):
+    """
+    :param pausa: Segundos de espera depois de cada moeda.
+    :param passadas: Quantas vezes percorrer a lista (None = pra sempre; os benchmarks usam um número fixo).
+    """
+    passada = 0
+    while passadas is None or passada < passadas:
+        passada += 1
+
         for moeda in moedas:
             try:
-                dados_atualizados = pegando_dados(moeda["codigo"], intervalo)
-                moeda = estrategia_trade(dados_atualizados, moeda)
+                with metricas.cronometrar("ciclo"):
+                    dados_atualizados = pegando_dados(moeda["codigo"], intervalo)
+                    with metricas.cronometrar("estrategia"):
+                        moeda = estrategia_trade(dados_atualizados, moeda)
             except Exception as e:
                 horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
                 print(f"[{horario_atual}] Erro ao processar {moeda['codigo']}: {str(e)}")
                 log(pasta_arquivo_erro, f"[{horario_atual}] Erro em {moeda['codigo']}: {str(e)}\n")
-            time.sleep(2)  # Pequeno intervalo para evitar sobrecarga na API
+            time.sleep(pausa)  # Pequeno intervalo para evitar sobrecarga na API
+#---------------------------------------------------------------------------------------------------
+
+
+# MODO EM LOTE: AS MÉDIAS E OS SINAIS DE TODAS AS MOEDAS SAEM DE UMA MATRIZ SÓ A CADA PASSADA
+# Um get_symbol_ticker traz o preço atual só dos pares operados; o get_klines de uma moeda só é chamado quando a candle dela fecha
+#---------------------------------------------------------------------------------------------------
+def atualizar_fechamentos_lote(moedas, intervalo, largura):
+    agora_ms = int(time.time() * 1000)
+    precos_atuais = None
+    fechamentos = []
+
+    for moeda in moedas:
+        armazenamento = pegar_armazenamento(moeda["codigo"], intervalo)
+        try:
+            if armazenamento.vela_aberta is None or armazenamento.vela_aberta[1] < agora_ms:
+                armazenamento.atualizar(pegar_cliente())
+            else:
+                if precos_atuais is None:
+                    # symbols (ARRAY JSON) EM VEZ DE NENHUM FILTRO, SENÃO A BINANCE DEVOLVE OS MILHARES DE PARES DA EXCHANGE
+                    codigos = json.dumps([moeda_lote["codigo"] for moeda_lote in moedas], separators=(",", ":"))
+                    precos_atuais = {ticker["symbol"]: ticker["price"] for ticker in pegar_cliente().get_symbol_ticker(symbols=codigos)}
+                if moeda["codigo"] in precos_atuais:
+                    armazenamento.vela_aberta = (float(precos_atuais[moeda["codigo"]]), armazenamento.vela_aberta[1])
+        except Exception as e:
+            horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+            print(f"[{horario_atual}] Erro ao pegar dados para {moeda['codigo']}: {str(e)}")
+            log(pasta_arquivo_erro, f"[{horario_atual}] Erro ao pegar dados para {moeda['codigo']}: {str(e)}\n")
+
+        fechamentos.append(armazenamento.ultimas(largura)[0])
+    return fechamentos
+
+
+def rodar_varias_moedas_lote(moedas, intervalo, pausa=2):
+    import numpy as np
+    from sinais_carteira import empilhar_fechamentos, avaliar_sinais, moedas_para_operar, sinal_compra
+
+    largura = max(media_movel_ligeira, media_movel_rapida, media_movel_lenta)
+    sinais_anteriores = None
+
+    while True:
+        try:
+            with metricas.cronometrar("buscar_candles_lote"):
+                fechamentos = atualizar_fechamentos_lote(moedas, intervalo, largura)
+            with metricas.cronometrar("indicadores_lote"):
+                medias, sinais = avaliar_sinais(empilhar_fechamentos(fechamentos, largura), media_movel_ligeira, media_movel_rapida, media_movel_lenta)
+            posicoes = np.fromiter((moeda["posicao_atual"] for moeda in moedas), dtype=bool, count=len(moedas))
+
+            # SÓ AS MOEDAS CUJO SINAL MUDOU DESDE A ÚLTIMA PASSADA SÃO REGISTRADAS
+            #-------------------------------------------------------------------------------------------
+            mudaram = range(len(moedas)) if sinais_anteriores is None else np.flatnonzero(sinais != sinais_anteriores)
+            for indice in mudaram:
+                moeda = moedas[indice]
+                print(f"[{moeda['ativo']}] Sinal: {int(sinais[indice])} | Média Ligeira: {medias['media_ligeira'][indice]} | Média Rápida: {medias['media_rapida'][indice]} | Média Devagar: {medias['media_devagar'][indice]}")
+                registrar("sinal", codigo=moeda["codigo"], ativo=moeda["ativo"], sinal=int(sinais[indice]), posicao=moeda["posicao_atual"],
+                          **{nome: float(valores[indice]) for nome, valores in medias.items()})
+            sinais_anteriores = sinais
+            #-------------------------------------------------------------------------------------------
+
+            # SÓ ENTRA NO CÓDIGO DE CADA MOEDA QUANDO O SINAL NÃO BATE COM A POSIÇÃO
+            #-------------------------------------------------------------------------------------------
+            for indice in moedas_para_operar(sinais, posicoes):
+                moeda = moedas[indice]
+                medias_moeda = {nome: float(valores[indice]) for nome, valores in medias.items()}
+                try:
+                    if sinais[indice] == sinal_compra:
+                        comprar(moeda, medias_moeda)
+                    else:
+                        vender(moeda, medias_moeda, fechamentos[indice][-1])
+                except Exception as e:
+                    horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+                    print(f"[{horario_atual}] Erro na estratégia para {moeda['ativo']}: {str(e)}")
+                    log(pasta_arquivo_erro, f"[{horario_atual}] Erro na estratégia para {moeda['ativo']}: {str(e)}\n")
+            #-------------------------------------------------------------------------------------------
+        except Exception as e:
+            horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+            print(f"[{horario_atual}] Erro ao processar o lote de moedas: {str(e)}")
+            log(pasta_arquivo_erro, f"[{horario_atual}] Erro no lote de moedas: {str(e)}\n")
+        time.sleep(pausa)
+#---------------------------------------------------------------------------------------------------
+
+
+# MODO ASSÍNCRONO: CADA MOEDA NO SEU PRÓPRIO LOOP, TODAS AO MESMO TEMPO
+# As chamadas da Binance continuam síncronas e rodam em threads, o limitador de peso é dividido entre todas as moedas
+#---------------------------------------------------------------------------------------------------
+async def rodar_moeda_async(moeda, intervalo, pausa=2):
+    import asyncio
+
+    while True:
+        try:
+            dados_atualizados = await asyncio.to_thread(pegando_dados, moeda["codigo"], intervalo)
+            await asyncio.to_thread(estrategia_trade, dados_atualizados, moeda)
+        except Exception as e:
+            horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+            print(f"[{horario_atual}] Erro ao processar {moeda['codigo']}: {str(e)}")
+            log(pasta_arquivo_erro, f"[{horario_atual}] Erro em {moeda['codigo']}: {str(e)}\n")
+        await asyncio.sleep(pausa)  # Intervalo entre passadas da MESMA moeda, as outras não esperam
+
+
+async def rodar_varias_moedas_async(moedas, intervalo, limitador=None, pausa=2):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from limitador import LimitadorPeso
+
+    # O PESO É DESCONTADO POR CHAMADA NO CLIENTE, DENTRO DAS THREADS
+    limitar_cliente(limitador or LimitadorPeso())
+
+    # UMA THREAD POR MOEDA PRA NENHUMA FICAR NA FILA DO EXECUTOR PADRÃO
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max(len(moedas), 1)))
+
+    await asyncio.gather(*(rodar_moeda_async(moeda, intervalo, pausa) for moeda in moedas))
+#---------------------------------------------------------------------------------------------------
+
+
+# MODO POR EVENTOS: A ESTRATÉGIA SÓ RODA QUANDO UMA CANDLE FECHA NO STREAM (x == true)
+#---------------------------------------------------------------------------------------------------
+def processar_vela_fechada(moeda, evento, intervalo):
+    import numpy as np
+    from armazenamento_candles import duracao_intervalo_ms
+
+    vela = evento["k"]
+    tempo_fechamento = int(vela["T"])
+    armazenamento = pegar_armazenamento(moeda["codigo"], intervalo)
+
+    # O STREAM CAIU E PERDEU CANDLES: COMPLETA PELA API ANTES, SENÃO O BURACO FICA PRA SEMPRE NO HISTÓRICO
+    ultimo = armazenamento.ultimo_tempo_fechamento
+    if ultimo is None or tempo_fechamento - ultimo > duracao_intervalo_ms(intervalo):
+        with metricas.cronometrar("buscar_candles"):
+            armazenamento.atualizar(pegar_cliente())
+
+    armazenamento.adicionar(np.array([float(vela["c"])]), np.array([tempo_fechamento], dtype=np.int64))
+    armazenamento.vela_aberta = None
+
+    estrategia_trade(dados_armazenados(moeda["codigo"], intervalo), moeda)
+
+
+async def rodar_por_eventos(moedas, intervalo, fonte=None):
+    import asyncio
+    from fontes_klines import FonteWebsocketBinance, despachar_velas_fechadas
+    from saldos import acompanhar_conta
+
+    def ao_errar(codigo, e):
+        horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        print(f"[{horario_atual}] Erro ao processar {codigo}: {str(e)}")
+        log(pasta_arquivo_erro, f"[{horario_atual}] Erro em {codigo}: {str(e)}\n")
+
+    def ao_desconectar(e, espera):
+        horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        print(f"[{horario_atual}] Websocket de candles caiu, reconectando em {espera}s: {str(e)}")
+        log(pasta_arquivo_erro, f"[{horario_atual}] Websocket de candles caiu, reconectando em {espera}s: {str(e)}\n")
+
+    def erro_conta(e):
+        horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        print(f"[{horario_atual}] User data stream caiu, saldos seguem pela atualização periódica: {str(e)}")
+        log(pasta_arquivo_erro, f"[{horario_atual}] User data stream caiu: {str(e)}\n")
+
+    def completar_candles(codigo):
+        # AS CANDLES QUE FECHARAM COM O STREAM FORA DO AR VÊM PELA API
+        with metricas.cronometrar("buscar_candles"):
+            pegar_armazenamento(codigo, intervalo).atualizar(pegar_cliente())
+
+    ao_vivo = fonte is None
+    fonte = fonte or FonteWebsocketBinance(api_key, secret_key, ao_desconectar=ao_desconectar)
+    por_codigo = {moeda["codigo"]: moeda for moeda in moedas}
+
+    # NO MODO AO VIVO OS SALDOS TAMBÉM VÊM PELO USER DATA STREAM, NUMA TAREFA SEPARADA: SE ELE CAIR, AS CANDLES CONTINUAM
+    tarefa_conta = asyncio.create_task(acompanhar_conta(saldos, api_key, secret_key, ao_errar=erro_conta)) if ao_vivo else None
+    try:
+        await despachar_velas_fechadas(
+            fonte, list(por_codigo), intervalo,
+            ao_fechar=lambda codigo, evento: processar_vela_fechada(por_codigo[codigo], evento, intervalo),
+            ao_errar=ao_errar,
+            ao_reconectar=completar_candles,
+        )
+    finally:
+        if tarefa_conta is not None:
+            tarefa_conta.cancel()
 #---------------------------------------------------------------------------------------------------
 
 
 # Função de backtesting
-def backtest_estrategia(dados, media_rapida=7, media_lenta=40, taxa=0.001, valor_por_trade=11):
+def backtest_estrategia(dados, media_rapida=7, media_lenta=40, taxa=0.001, valor_por_trade=11, plotar=False, cache=None):
     """
     Realiza o backtest da estratégia de médias móveis em dados históricos.
 
@@ -319,52 +669,71 @@ def backtest_estrategia(dados, media_rapida=7, media_lenta=40, taxa=0.001, valor
     - media_lenta: Período da média móvel lenta (default=40).
     - taxa: Taxa da Binance (0.1% = 0.001).
     - valor_por_trade: Valor fixo investido em cada trade em BRL.
+    - plotar: Se True, abre o gráfico com preços, médias e sinais (default=False, pra rodar sem tela).
+    - cache: CacheBacktest opcional; com os mesmos preços e parâmetros o resultado e as médias vêm do disco.
 
     Retorna:
-    - resultados: DataFrame com os sinais e resultados acumulados.
+    - resultados: DataFrame com os sinais e o patrimônio acumulado (coluna 'patrimonio').
+    - historico: Lista de operações (tipo, tempo_fechamento, preço, valor).
     """
+    import pandas as pd
+    from simulacao import gerar_sinais, simular_operacoes
+    from cache_backtest import impressao_digital
+
     dados = dados.copy()
     dados["fechamento"] = pd.to_numeric(dados["fechamento"])
+    precos = dados["fechamento"].to_numpy()
+
+    # Calculando as médias móveis (com cache, cada janela é calculada uma vez por histórico)
+    def media_movel(janela):
+        return dados["fechamento"].rolling(window=janela).mean().to_numpy()
+
+    if cache is not None:
+        digital = impressao_digital(precos)
+        dados["media_rapida"] = cache.media_movel(digital, media_rapida, lambda: media_movel(media_rapida))
+        dados["media_lenta"] = cache.media_movel(digital, media_lenta, lambda: media_movel(media_lenta))
+        chave = cache.chave(digital, media_rapida=media_rapida, media_lenta=media_lenta, taxa=taxa, valor_por_trade=valor_por_trade, saldo_brl=10000)
+        resultado = cache.buscar(chave)
+    else:
+        dados["media_rapida"] = media_movel(media_rapida)
+        dados["media_lenta"] = media_movel(media_lenta)
+        resultado = None
+
+    if resultado is None:
+        # Gerando sinais de compra/venda (apenas no momento da mudança de tendência)
+        sinal = gerar_sinais(dados["media_rapida"].to_numpy(), dados["media_lenta"].to_numpy())  # 0 = neutro, 1 = compra, -1 = venda
+
+        # Simulando as operações com arrays (saldo inicial de 10000 BRL)
+        resultado = simular_operacoes(precos, sinal, taxa=taxa, valor_por_trade=valor_por_trade, saldo_brl=10000)
+        resultado["sinal"] = sinal
+        if cache is not None:
+            cache.guardar(chave, resultado)
 
-    # Calculando as médias móveis
-    dados["media_rapida"] = dados["fechamento"].rolling(window=media_rapida).mean()
-    dados["media_lenta"] = dados["fechamento"].rolling(window=media_lenta).mean()
-
-    # Gerando sinais de compra/venda (apenas no momento da mudança de tendência)
-    dados["sinal"] = 0  # 0 = neutro, 1 = compra, -1 = venda
-    dados.loc[(dados["media_rapida"] > dados["media_lenta"]) & (dados["media_rapida"].shift(1) <= dados["media_lenta"].shift(1)), "sinal"] = 1
-    dados.loc[(dados["media_rapida"] <= dados["media_lenta"]) & (dados["media_rapida"].shift(1) > dados["media_lenta"].shift(1)), "sinal"] = -1
-
-    # Simulando as operações
-    saldo_brl = 10000  # Saldo inicial em BRL
-    saldo_ativo = 0
-    historico = []
-
-    for i in range(len(dados)):
-        preco_atual = dados["fechamento"].iloc[i]
-
-        if dados["sinal"].iloc[i] == 1:
-            # Compra
-            if saldo_brl >= valor_por_trade:
-                quantidade_comprada = valor_por_trade / preco_atual
-                saldo_ativo += quantidade_comprada * (1 - taxa)
-                saldo_brl -= valor_por_trade
-                historico.append(("compra", dados["tempo_fechamento"].iloc[i], preco_atual, valor_por_trade))
-
-        elif dados["sinal"].iloc[i] == -1:
-            # Venda
-            valor_venda = saldo_ativo * preco_atual * (1 - taxa)
-            saldo_brl += valor_venda
-            historico.append(("venda", dados["tempo_fechamento"].iloc[i], preco_atual, valor_venda))
-            saldo_ativo = 0
+    dados["sinal"] = resultado["sinal"]
+    dados["patrimonio"] = resultado["patrimonio"]
+
+    tempos = dados["tempo_fechamento"].iloc[resultado["indices"]].tolist()
+    historico = [
+        ("compra", tempo, precos[indice], valor_por_trade) if tipo == 1 else ("venda", tempo, precos[indice], valor)
+        for indice, tipo, valor, tempo in zip(resultado["indices"], resultado["tipos"], resultado["valores"], tempos)
+    ]
 
     # Calculando o saldo final
-    saldo_final = saldo_brl + saldo_ativo * dados["fechamento"].iloc[-1]
+    saldo_final = resultado["patrimonio"][-1]
 
     print(f"Saldo Final: {saldo_final:.2f} BRL")
     print(f"Operações Realizadas: {len(historico)}")
 
-    # Visualização
+    if plotar:
+        plotar_backtest(dados, media_rapida, media_lenta)
+
+    return dados, historico
+
+
+# Visualização do backtest
+def plotar_backtest(dados, media_rapida, media_lenta):
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 6))
     plt.plot(dados["tempo_fechamento"], dados["fechamento"], label="Preço de Fechamento")
     plt.plot(dados["tempo_fechamento"], dados["media_rapida"], label=f"Média Rápida ({media_rapida})")
@@ -376,8 +745,6 @@ def backtest_estrategia(dados, media_rapida=7, media_lenta=40, taxa=0.001, valor
     plt.legend()
     plt.show()
 
-    return dados, historico
-
 
 
 
@@ -386,7 +753,9 @@ def backtest_estrategia(dados, media_rapida=7, media_lenta=40, taxa=0.001, valor
 # Execução principal
 #------------------------------------------------------------------------------------------------------------------------------
 if __name__ == "__main__":
-    modo = input("Escolha o modo de execução ( 1 - RODAR / 2 - QTD MINIMA DE COMPRA/ 0 - SAIR): ").strip().lower()
+    import asyncio
+
+    modo = input("Escolha o modo de execução ( 1 - RODAR / 2 - QTD MINIMA DE COMPRA / 3 - BACKTEST / 4 - OTIMIZAR MÉDIAS / 5 - RODAR ASYNC / 6 - RODAR WEBSOCKET / 7 - BAIXAR HISTÓRICO / 8 - BACKTEST HISTÓRICO / 9 - BACKTEST CARTEIRA / 10 - RODAR EM LOTE / 0 - SAIR): ").strip().lower()
    
     if modo == "0":
         print("Saindo...")
@@ -395,6 +764,10 @@ if __name__ == "__main__":
         log(pasta_arquivo_infos_iniciadas, f"[{horario_atual}] --------- NOVA EXECUÇÃO Infos passadas: [{moedas}] ---------\n")
 
         verifica_moedas()
+        saldos.iniciar_atualizacao_periodica(intervalo_atualizacao_saldos, ao_errar=erro_atualizar_saldos)
+        filtros.atualizar()
+        filtros.iniciar_atualizacao_periodica(ao_errar=erro_atualizar_filtros)
+        iniciar_metricas()
 
         rodar_varias_moedas(moedas, periodo)
 
@@ -404,14 +777,129 @@ if __name__ == "__main__":
     elif modo == "3":
         # Carregando dados históricos para teste (exemplo de arquivo CSV)
         # Substituir por API Binance para obter os candles reais
-        dados_historicos = pegando_dados("BTCBRL", periodo)
-        dados_historicos["tempo_fechamento"] = pd.to_datetime(dados_historicos["tempo_fechamento"])
+        dados_historicos = dados_para_dataframe(pegando_dados("BTCBRL", periodo))
 
         # Executando o backtest
+        from cache_backtest import CacheBacktest
+
         resultados, operacoes = backtest_estrategia(
-            dados_historicos, media_rapida=7, media_lenta=40
+            dados_historicos, media_rapida=7, media_lenta=40, plotar=True, cache=CacheBacktest()
         )
-    
+
+    elif modo == "4":
+        # Varredura das janelas/taxa/valor por trade em paralelo com a mesma simulação do backtest
+        from otimizador import varrer_parametros
+
+        dados_historicos = pegando_dados("BTCBRL", periodo)
+        resultados = varrer_parametros(
+            dados_historicos,
+            medias_rapidas=range(2, 21),
+            medias_lentas=range(10, 101, 5),
+            taxas=[0.001],
+            valores_por_trade=[11, 50, 100],
+        )
+        print(resultados.head(20).to_string())
+
+    elif modo == "5":
+        horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        log(pasta_arquivo_infos_iniciadas, f"[{horario_atual}] --------- NOVA EXECUÇÃO (ASYNC) Infos passadas: [{moedas}] ---------\n")
+
+        from limitador import LimitadorPeso
+
+        # LIMITADOR INSTALADO ANTES DAS PRIMEIRAS CHAMADAS, PRA ELAS TAMBÉM ENTRAREM NA CONTA
+        limitador = LimitadorPeso()
+        limitar_cliente(limitador)
+
+        verifica_moedas()
+        saldos.iniciar_atualizacao_periodica(intervalo_atualizacao_saldos, ao_errar=erro_atualizar_saldos)
+        filtros.atualizar()
+        filtros.iniciar_atualizacao_periodica(ao_errar=erro_atualizar_filtros)
+        iniciar_metricas()
+
+        asyncio.run(rodar_varias_moedas_async(moedas, periodo, limitador))
+
+    elif modo == "6":
+        horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        log(pasta_arquivo_infos_iniciadas, f"[{horario_atual}] --------- NOVA EXECUÇÃO (WEBSOCKET) Infos passadas: [{moedas}] ---------\n")
+
+        verifica_moedas()
+        saldos.iniciar_atualizacao_periodica(intervalo_atualizacao_saldos, ao_errar=erro_atualizar_saldos)
+        filtros.atualizar()
+        filtros.iniciar_atualizacao_periodica(ao_errar=erro_atualizar_filtros)
+        iniciar_metricas()
+
+        # Completa o histórico local antes do primeiro fechamento chegar pelo stream
+        for moeda in moedas:
+            pegando_dados(moeda["codigo"], periodo)
+
+        asyncio.run(rodar_por_eventos(moedas, periodo))
+
+    elif modo == "7":
+        # Baixa anos de candles pra todas as moedas direto nos arquivos de ./dados
+        import calendar
+        from armazenamento_candles import baixar_historico
+        from limitador import LimitadorPeso
+
+        data_inicial = input("Data inicial (AAAA-MM-DD): ").strip()
+        intervalo_historico = input(f"Intervalo das candles (ex.: 1m, 1h) [{periodo}]: ").strip() or periodo
+        inicio_ms = calendar.timegm(time.strptime(data_inicial, "%Y-%m-%d")) * 1000
+        limitador = LimitadorPeso()
+
+        for moeda in moedas:
+            gravadas = baixar_historico(pegar_cliente(), moeda["codigo"], intervalo_historico, inicio_ms, limitador=limitador,
+                                        ao_progredir=lambda codigo, tempo: print(f"[{codigo}] até {time.strftime('%Y-%m-%d %H:%M', time.localtime(tempo / 1000))}", end="\r"))
+            print(f"[{moeda['codigo']}] {gravadas} candles novas gravadas")
+
+    elif modo == "8":
+        # Backtest em blocos sobre o histórico baixado no modo 7 (não carrega tudo na memória)
+        from backtest_historico import backtest_em_blocos
+
+        codigo_backtest = input("Codigo do ativo [BTCBRL]: ").strip().upper() or "BTCBRL"
+        intervalo_historico = input(f"Intervalo das candles (ex.: 1m, 1h) [{periodo}]: ").strip() or periodo
+
+        resultado = backtest_em_blocos(codigo_backtest, intervalo_historico, media_rapida=7, media_lenta=40)
+        print(f"Candles: {resultado['candles']}")
+        print(f"Saldo Final: {resultado['saldo_final']:.2f} BRL")
+        print(f"Operações Realizadas: {resultado['operacoes']}")
+        print(f"Drawdown Máximo: {resultado['drawdown'] * 100:.2f}%")
+
+    elif modo == "9":
+        # Todas as moedas juntas com o mesmo saldo em BRL e a reserva, usando o histórico de ./dados
+        from armazenamento_candles import abrir_colunas
+        from backtest_portfolio import backtest_portfolio
+
+        intervalo_historico = input(f"Intervalo das candles (ex.: 1m, 1h) [{periodo}]: ").strip() or periodo
+        saldo_inicial = float(input("Saldo inicial em BRL [2000]: ").strip() or 2000)
+
+        velas = {}
+        for moeda in moedas:
+            if intervalo_historico == periodo:
+                pegando_dados(moeda["codigo"], periodo)
+            fechamento, tempo_fechamento = abrir_colunas(moeda["codigo"], intervalo_historico)
+            if len(fechamento):
+                velas[moeda["codigo"]] = (fechamento, tempo_fechamento)
+
+        resultado = backtest_portfolio(velas, moedas, quantidade_reservada=quantidade_reservada, saldo_inicial=saldo_inicial,
+                                       media_ligeira=media_movel_ligeira, media_rapida=media_movel_rapida, media_lenta=media_movel_lenta)
+        for codigo, quantidade in resultado["quantidades"].items():
+            print(f"[{codigo}] em carteira: {quantidade:.8f}")
+        print(f"Saldo BRL: {resultado['saldo_brl']:.2f} BRL")
+        print(f"Patrimônio Final: {resultado['saldo_final']:.2f} BRL")
+        print(f"Operações Realizadas: {resultado['operacoes']}")
+        print(f"Drawdown Máximo: {resultado['drawdown'] * 100:.2f}%")
+
+    elif modo == "10":
+        horario_atual = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        log(pasta_arquivo_infos_iniciadas, f"[{horario_atual}] --------- NOVA EXECUÇÃO (LOTE) Infos passadas: [{moedas}] ---------\n")
+
+        verifica_moedas()
+        saldos.iniciar_atualizacao_periodica(intervalo_atualizacao_saldos, ao_errar=erro_atualizar_saldos)
+        filtros.atualizar()
+        filtros.iniciar_atualizacao_periodica(ao_errar=erro_atualizar_filtros)
+        iniciar_metricas()
+
+        rodar_varias_moedas_lote(moedas, periodo)
+
     else:
         print("Modo inválido, tente novamente.")
 #------------------------------------------------------------------------------------------------------------------------------
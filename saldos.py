@@ -0,0 +1,120 @@
+import threading
+import time
+
+
+class CacheSaldos:
+    """
+    Saldos da conta indexados pelo ativo (consulta O(1)), no lugar da lista `conta["balances"]`.
+
+    Os valores ficam como strings, igual ao que a Binance devolve, pra quem usa continuar convertendo com float/Decimal.
+    O cache é renovado com get_account depois de cada ordem (atualizar), de tempos em tempos por uma thread
+    (iniciar_atualizacao_periodica), por eventos do user data stream (aplicar_evento_conta) e, como garantia,
+    na própria consulta se passou de `idade_maxima` segundos sem nenhuma atualização.
+
+    :param pegar_cliente: Função que devolve o cliente da Binance; só é chamada na primeira atualização.
+    """
+
+    def __init__(self, pegar_cliente, idade_maxima=300):
+        self.pegar_cliente = pegar_cliente
+        self.idade_maxima = idade_maxima
+        self.saldos = {}          # ativo -> {"free": "0.1", "locked": "0.0"}
+        self.atualizado_em = None
+        self.trava = threading.Lock()
+
+    # BUSCAR A CONTA INTEIRA NA BINANCE
+    #----------------------------------------------------------------------------------------
+    def atualizar(self):
+        conta = self.pegar_cliente().get_account()
+        saldos = {ativo["asset"]: {"free": ativo["free"], "locked": ativo["locked"]} for ativo in conta["balances"]}
+        with self.trava:
+            self.saldos = saldos
+            self.atualizado_em = time.monotonic()
+
+    def invalidar(self):
+        # A PRÓXIMA CONSULTA BUSCA A CONTA DE NOVO (EX.: A ATUALIZAÇÃO DEPOIS DE UMA ORDEM FALHOU)
+        with self.trava:
+            self.atualizado_em = None
+    #----------------------------------------------------------------------------------------
+
+    # CONSULTAS
+    #----------------------------------------------------------------------------------------
+    def _conferir_idade(self):
+        if self.atualizado_em is None or time.monotonic() - self.atualizado_em > self.idade_maxima:
+            self.atualizar()
+
+    def livre(self, ativo, padrao="0"):
+        self._conferir_idade()
+        saldo = self.saldos.get(ativo)
+        return saldo["free"] if saldo is not None else padrao
+
+    def __contains__(self, ativo):
+        self._conferir_idade()
+        return ativo in self.saldos
+    #----------------------------------------------------------------------------------------
+
+    # EVENTO outboundAccountPosition DO USER DATA STREAM (SÓ VEM OS ATIVOS QUE MUDARAM)
+    #----------------------------------------------------------------------------------------
+    def aplicar_evento_conta(self, evento):
+        if evento.get("e") != "outboundAccountPosition":
+            return
+        with self.trava:
+            for ativo in evento["B"]:
+                self.saldos[ativo["a"]] = {"free": ativo["f"], "locked": ativo["l"]}
+            self.atualizado_em = time.monotonic()
+    #----------------------------------------------------------------------------------------
+
+    # ATUALIZAÇÃO PERIÓDICA EM SEGUNDO PLANO
+    #----------------------------------------------------------------------------------------
+    def iniciar_atualizacao_periodica(self, intervalo=60, ao_errar=None):
+        def rodar():
+            while True:
+                time.sleep(intervalo)
+                try:
+                    self.atualizar()
+                except Exception as e:
+                    if ao_errar is not None:
+                        ao_errar(e)
+
+        thread = threading.Thread(target=rodar, name="atualizacao_saldos", daemon=True)
+        thread.start()
+        return thread
+    #----------------------------------------------------------------------------------------
+
+
+# ACOMPANHAR A CONTA PELO USER DATA STREAM DA BINANCE
+#--------------------------------------------------------------------------------------------
+async def acompanhar_conta(cache, api_key, secret_key, ao_errar=None, espera_inicial=1, espera_maxima=60):
+    """
+    Aplica os eventos da conta no cache enquanto o programa rodar; nunca levanta erro.
+
+    Se o stream cair, chama `ao_errar(exceção)` e reconecta com espera dobrando até `espera_maxima` segundos.
+    Depois de cada reconexão busca a conta inteira, porque os eventos do meio se perderam; enquanto isso os
+    saldos continuam vindo da atualização periódica / idade máxima do cache.
+    """
+    import asyncio
+    from binance import AsyncClient, BinanceSocketManager
+
+    espera = espera_inicial
+    conectou = False
+    while True:
+        try:
+            cliente = await AsyncClient.create(api_key, secret_key)
+            try:
+                async with BinanceSocketManager(cliente).user_socket() as socket:
+                    espera = espera_inicial
+                    if conectou:
+                        await asyncio.to_thread(cache.atualizar)
+                    conectou = True
+                    while True:
+                        evento = await socket.recv()
+                        if evento.get("e") == "error":
+                            raise ConnectionError(evento.get("m", "Erro no user data stream da Binance"))
+                        cache.aplicar_evento_conta(evento)
+            finally:
+                await cliente.close_connection()
+        except Exception as e:
+            if ao_errar is not None:
+                ao_errar(e)
+        await asyncio.sleep(espera)
+        espera = min(espera * 2, espera_maxima)
+#--------------------------------------------------------------------------------------------
@@ -0,0 +1,146 @@
+import numpy as np
+
+
+# SINAIS DE CRUZAMENTO DAS MÉDIAS (1 = COMPRA, -1 = VENDA, 0 = NEUTRO)
+#----------------------------------------------------------------------------------------------------
+def gerar_sinais(media_rapida, media_lenta):
+    """
+    Marca só o momento da mudança de tendência, igual ao backtest com pandas:
+    compra quando a rápida passa pra cima da lenta e venda quando volta pra baixo ou empata.
+    Comparações com nan (início das médias) contam como falsas.
+    """
+    media_rapida = np.asarray(media_rapida, dtype=np.float64)
+    media_lenta = np.asarray(media_lenta, dtype=np.float64)
+
+    acima = media_rapida > media_lenta
+    abaixo = media_rapida <= media_lenta
+
+    sinal = np.zeros(len(media_rapida), dtype=np.int64)
+    sinal[1:][acima[1:] & abaixo[:-1]] = 1
+    sinal[1:][abaixo[1:] & acima[:-1]] = -1
+    return sinal
+#----------------------------------------------------------------------------------------------------
+
+
+# SIMULAÇÃO DAS OPERAÇÕES
+#----------------------------------------------------------------------------------------------------
+def simular_operacoes(precos, sinal, taxa=0.001, valor_por_trade=11, saldo_brl=10000, saldo_ativo=0.0):
+    """
+    Executa os sinais sobre os preços e devolve as operações e a curva de patrimônio.
+
+    Regras (as mesmas do loop antigo do backtest_estrategia):
+    - compra: gasta `valor_por_trade` BRL se tiver saldo, recebendo a quantidade menos a taxa;
+    - venda: vende todo o ativo pelo preço atual menos a taxa.
+
+    Como os cruzamentos alternam compra/venda, cada venda zera o que a compra anterior colocou, então tudo é
+    calculado com operações de array sobre os eventos. Se os sinais não alternarem ou faltar saldo pra
+    alguma compra, cai num loop que percorre só os eventos (nunca as linhas).
+
+    :return: Dicionário com indices, tipos e valores das operações executadas, saldo_brl e saldo_ativo
+             finais e patrimonio (saldo_brl + saldo_ativo * preço) em cada linha.
+    """
+    precos = np.asarray(precos, dtype=np.float64)
+    sinal = np.asarray(sinal)
+    indices = np.flatnonzero(sinal)
+    tipos = sinal[indices]
+
+    compra = tipos == 1
+    precos_eventos = precos[indices]
+    alternado = bool(np.all(tipos[1:] != tipos[:-1]))
+
+    if alternado and len(indices) > 0:
+        quantidade = np.where(compra, valor_por_trade / precos_eventos * (1 - taxa), 0.0)
+        ativo_depois = quantidade.copy()
+        ativo_depois[0] = saldo_ativo + quantidade[0] if compra[0] else 0.0
+        ativo_antes = np.concatenate(([saldo_ativo], ativo_depois[:-1]))
+
+        valores = np.where(compra, valor_por_trade, ativo_antes * precos_eventos * (1 - taxa))
+        saldos = np.cumsum(np.concatenate(([saldo_brl], np.where(compra, -valor_por_trade, valores))))
+
+        # saldos[k] É O SALDO ANTES DO EVENTO k
+        acessivel = bool(np.all(saldos[:-1][compra] >= valor_por_trade))
+    else:
+        acessivel = len(indices) == 0
+        valores = np.empty(0)
+        saldos = np.array([saldo_brl], dtype=np.float64)
+        ativo_depois = np.empty(0)
+
+    if not acessivel:
+        indices, tipos, valores, saldos, ativo_depois = _simular_eventos(precos, indices, tipos, taxa, valor_por_trade, saldo_brl, saldo_ativo)
+
+    # ESTADO DE CADA LINHA = ESTADO DEPOIS DO ÚLTIMO EVENTO ATÉ ELA
+    marcador = np.zeros(len(precos), dtype=np.int64)
+    marcador[indices] = 1
+    ultimo_evento = np.cumsum(marcador)
+    saldo_linha = saldos[ultimo_evento]
+    ativo_linha = np.concatenate(([saldo_ativo], ativo_depois))[ultimo_evento]
+
+    return {
+        "indices": indices,
+        "tipos": tipos,
+        "valores": valores,
+        "saldo_brl": saldos[-1],
+        "saldo_ativo": ativo_linha[-1] if len(precos) else saldo_ativo,
+        "patrimonio": saldo_linha + ativo_linha * precos,
+    }
+
+
+def _simular_eventos(precos, indices, tipos, taxa, valor_por_trade, saldo_brl, saldo_ativo):
+    executados, tipos_executados, valores, saldos, ativos = [], [], [], [saldo_brl], []
+
+    for indice, tipo in zip(indices, tipos):
+        preco_atual = precos[indice]
+
+        if tipo == 1:
+            if saldo_brl < valor_por_trade:
+                continue
+            quantidade_comprada = valor_por_trade / preco_atual
+            saldo_ativo += quantidade_comprada * (1 - taxa)
+            saldo_brl -= valor_por_trade
+            valores.append(valor_por_trade)
+        else:
+            valor_venda = saldo_ativo * preco_atual * (1 - taxa)
+            saldo_brl += valor_venda
+            saldo_ativo = 0
+            valores.append(valor_venda)
+
+        executados.append(indice)
+        tipos_executados.append(tipo)
+        saldos.append(saldo_brl)
+        ativos.append(saldo_ativo)
+
+    return (np.array(executados, dtype=np.int64), np.array(tipos_executados, dtype=np.int64), np.array(valores, dtype=np.float64),
+            np.array(saldos, dtype=np.float64), np.array(ativos, dtype=np.float64))
+#----------------------------------------------------------------------------------------------------
+
+
+# MAIOR QUEDA DO PATRIMÔNIO EM RELAÇÃO AO PICO ANTERIOR (0.15 = 15%)
+#----------------------------------------------------------------------------------------------------
+def calcular_drawdown(patrimonio):
+    patrimonio = np.asarray(patrimonio, dtype=np.float64)
+    if len(patrimonio) == 0:
+        return 0.0
+    picos = np.maximum.accumulate(patrimonio)
+    return float(np.max((picos - patrimonio) / picos))
+#----------------------------------------------------------------------------------------------------
+
+
+# MÉDIAS MÓVEIS DE VÁRIAS JANELAS A PARTIR DE UMA ÚNICA SOMA ACUMULADA
+#----------------------------------------------------------------------------------------------------
+def calcular_medias_moveis(precos, janelas):
+    """
+    :param precos: Array de preços de fechamento.
+    :param janelas: Janelas desejadas (ex.: [7, 20, 40]).
+    :return: Dicionário janela -> array da média (nan antes de ter `janela` preços).
+    """
+    precos = np.asarray(precos, dtype=np.float64)
+    soma = np.concatenate(([0.0], np.cumsum(precos)))
+
+    medias = {}
+    for janela in set(janelas):
+        media = np.full(len(precos), np.nan)
+        if janela <= len(precos):
+            media[janela - 1:] = (soma[janela:] - soma[:-janela]) / janela
+        medias[janela] = media
+    return medias
+#----------------------------------------------------------------------------------------------------
@@ -0,0 +1,63 @@
+import numpy as np
+
+
+# MATRIZ (MOEDA x CANDLE) COM OS ÚLTIMOS FECHAMENTOS DE TODAS AS MOEDAS
+#----------------------------------------------------------------------------------------------------
+def empilhar_fechamentos(fechamentos, largura):
+    """
+    Junta os últimos `largura` fechamentos de cada moeda numa matriz só.
+
+    Moedas com menos candles ficam com nan à esquerda, então as médias que precisariam delas também dão nan
+    (e nenhuma condição de compra/venda é satisfeita), igual ao rolling do pandas.
+
+    :param fechamentos: Lista de arrays de fechamento, um por moeda (a última posição é a candle em andamento).
+    :return: Matriz float64 com shape (len(fechamentos), largura).
+    """
+    matriz = np.full((len(fechamentos), largura), np.nan)
+    for linha, fechamento in enumerate(fechamentos):
+        ultimos = fechamento[-largura:]
+        if len(ultimos):
+            matriz[linha, largura - len(ultimos):] = ultimos
+    return matriz
+#----------------------------------------------------------------------------------------------------
+
+
+# SINAIS DE TODAS AS MOEDAS DE UMA VEZ
+#----------------------------------------------------------------------------------------------------
+sinal_compra = 1
+sinal_venda = -1
+sinal_neutro = 0
+
+def avaliar_sinais(matriz, media_ligeira, media_rapida, media_lenta):
+    """
+    Calcula as três médias e o sinal do estrategia_trade pra todas as moedas numa chamada.
+
+    Parâmetros:
+    - matriz: Saída do empilhar_fechamentos (largura >= maior janela).
+
+    Retorna:
+    - (medias, sinais): dicionário com media_ligeira/media_rapida/media_devagar (um valor por moeda) e array int8
+      com `sinal_compra` (rápida e ligeira acima da lenta), `sinal_venda` (as duas abaixo) ou `sinal_neutro`.
+    """
+    medias = {
+        "media_ligeira": matriz[:, -media_ligeira:].mean(axis=1),
+        "media_rapida": matriz[:, -media_rapida:].mean(axis=1),
+        "media_devagar": matriz[:, -media_lenta:].mean(axis=1),
+    }
+    acima = (medias["media_rapida"] > medias["media_devagar"]) & (medias["media_ligeira"] > medias["media_devagar"])
+    abaixo = (medias["media_rapida"] < medias["media_devagar"]) & (medias["media_ligeira"] < medias["media_devagar"])
+
+    sinais = np.full(len(matriz), sinal_neutro, dtype=np.int8)
+    sinais[acima] = sinal_compra
+    sinais[abaixo] = sinal_venda
+    return medias, sinais
+
+
+def moedas_para_operar(sinais, posicoes):
+    """
+    Índices das moedas em que a estratégia manda operar: sinal de compra sem estar comprado ou de venda comprado.
+
+    :param posicoes: Array bool com o `posicao_atual` de cada moeda.
+    """
+    return np.flatnonzero(((sinais == sinal_compra) & ~posicoes) | ((sinais == sinal_venda) & posicoes))
+#----------------------------------------------------------------------------------------------------